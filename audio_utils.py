@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Audio Utilities
+Stream-copy compatible audio and cache AAC encodes of everything else
+"""
+
+import os
+import re
+import shutil
+import subprocess
+from pathlib import Path
+from ffmpeg_utils import get_ffmpeg_binary, encode_audio
+from frame_cache import DEFAULT_CACHE_DIR, file_hash, temp_file
+import profiler
+
+DEFAULT_AUDIO_CACHE_DIR = DEFAULT_CACHE_DIR.parent / 'audio'
+
+def probe_streams(media_path):
+    """Return (audio_codec, has_video) for a media file"""
+    result = subprocess.run(
+        [get_ffmpeg_binary(), '-hide_banner', '-i', str(media_path)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    info = result.stderr.decode(errors='replace')
+    match = re.search(r'Stream #\S+: Audio: (\w+)', info)
+    has_video = re.search(r'Stream #\S+: Video:', info) is not None
+    return (match.group(1) if match else None), has_video
+
+def prepare_audio(audio_path, work_dir, cache_dir=DEFAULT_AUDIO_CACHE_DIR):
+    """Return an AAC file that can be stream-copied into the output video.
+
+    AAC input without other streams is used as-is. Anything else is encoded
+    once and cached by content hash, so re-renders with the same song skip
+    audio encoding entirely.
+    """
+    with profiler.span('prepare audio'):
+        codec, has_video = probe_streams(audio_path)
+        if codec == 'aac' and not has_video:
+            return str(audio_path)
+        
+        if not cache_dir:
+            encoded = Path(work_dir) / 'audio.m4a'
+            encode_audio(audio_path, encoded)
+            return str(encoded)
+        
+        cache_dir = Path(cache_dir)
+        cached = cache_dir / f'{file_hash(audio_path)}.m4a'
+        if not cached.exists():
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            # ffmpeg picks the container from the extension
+            temp_path = temp_file(cache_dir, suffix='.tmp.m4a')
+            try:
+                encode_audio(audio_path, temp_path)
+                os.replace(temp_path, cached)
+            except BaseException:
+                Path(temp_path).unlink(missing_ok=True)
+                raise
+        return str(cached)
+
+def clear_audio_cache(cache_dir=DEFAULT_AUDIO_CACHE_DIR):
+    """Delete every cached audio encode"""
+    shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Batch Video Renderer
+Render every job in a JSON or CSV manifest, several at a time
+
+JSON manifest: a list of jobs (or {"jobs": [...]}), for example
+    [{"images": ["a.jpg", "b.jpg"], "audio": "song.mp3", "output": "out/a.mp4",
+      "preset": "tiktok", "duration": 4, "transition": 0.5},
+     {"image": "cover.jpg", "audio": "song.mp3", "output": "out/cover.mp4"}]
+
+CSV manifest: columns images (separated by ';'), audio, output and optionally
+preset, width, height, duration, transition. A row with a single image and no
+duration is rendered as a still-image video.
+
+Relative paths are resolved against the folder containing the manifest.
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from pathlib import Path
+from contextlib import redirect_stdout, redirect_stderr
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+def load_manifest(manifest_path):
+    """Read jobs from a JSON or CSV manifest"""
+    manifest_path = Path(manifest_path)
+    if manifest_path.suffix.lower() == '.csv':
+        with open(manifest_path, newline='', encoding='utf-8') as f:
+            jobs = []
+            for row in csv.DictReader(f):
+                job = {key: value for key, value in row.items() if value not in (None, '')}
+                images = [p.strip() for p in job.pop('images', '').split(';') if p.strip()]
+                if len(images) == 1 and 'duration' not in job:
+                    job['image'] = images[0]
+                else:
+                    job['images'] = images
+                jobs.append(job)
+    else:
+        with open(manifest_path, encoding='utf-8') as f:
+            jobs = json.load(f)
+        if isinstance(jobs, dict):
+            jobs = jobs.get('jobs', [])
+
+    return [resolve_job(job, manifest_path.parent, f'Job {n}') for n, job in enumerate(jobs, 1)]
+
+def resolve_job(job, base_dir, name='Job'):
+    """Check that a job has its required fields and resolve its paths against base_dir"""
+    if not isinstance(job, dict):
+        raise ValueError(f"{name} must be an object")
+    if not job.get('audio') or not job.get('output') or not (job.get('image') or job.get('images')):
+        raise ValueError(f"{name} needs 'audio', 'output' and 'image' or 'images'")
+    if 'image' not in job and not isinstance(job['images'], list):
+        raise ValueError(f"{name}: 'images' must be a list of paths")
+    base_dir = Path(base_dir)
+    job['audio'] = str(base_dir / job['audio'])
+    job['output'] = str(base_dir / job['output'])
+    if 'image' in job:
+        job['image'] = str(base_dir / job['image'])
+    else:
+        job['images'] = [str(base_dir / p) for p in job['images']]
+    return job
+
+def plan_concurrency(n_jobs, max_jobs=None, cpu_count=None):
+    """Decide how many jobs run at once and how many threads each encoder gets.
+
+    Cores are divided between concurrent jobs instead of letting every encoder
+    assume it owns the whole machine.
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    concurrent = max_jobs or max(1, cpu_count // 4)
+    concurrent = max(1, min(concurrent, n_jobs))
+    threads = max(1, cpu_count // concurrent)
+    return concurrent, threads
+
+def render_job(job, threads):
+    """Render a single manifest job"""
+    preset = str(job.get('preset', 'youtube')).lower()
+    custom_size = (int(job['width']), int(job['height'])) if preset == 'custom' else None
+    Path(job['output']).parent.mkdir(parents=True, exist_ok=True)
+
+    if 'image' in job:
+        import simple_video_creator
+        simple_video_creator.create_video(
+            job['image'],
+            job['audio'],
+            job['output'],
+            preset=preset,
+            custom_size=custom_size,
+            threads=threads
+        )
+    else:
+        import image_audio_to_video
+        image_audio_to_video.create_video(
+            job['images'],
+            job['audio'],
+            job['output'],
+            preset=preset,
+            custom_size=custom_size,
+            duration_per_image=float(job.get('duration', 5)),
+            transition_duration=float(job.get('transition', 0.5)),
+            workers=threads,
+            threads=threads
+        )
+
+def run_job(index, job, threads, log_dir):
+    """Run one job in a worker process, sending its console output to a log file"""
+    start = time.perf_counter()
+    log_path = Path(log_dir) / f'job_{index:04d}.log'
+    result = {'job': index, 'output': job['output'], 'log': str(log_path)}
+    try:
+        with open(log_path, 'w', encoding='utf-8') as log, redirect_stdout(log), redirect_stderr(log):
+            render_job(job, threads)
+        result['status'] = 'ok'
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = str(e)
+    result['seconds'] = round(time.perf_counter() - start, 2)
+    return result
+
+def run_batch(jobs, max_jobs=None, log_dir='batch_logs'):
+    """Render all jobs with a bounded number running at once, returning per-job results"""
+    concurrent, threads = plan_concurrency(len(jobs), max_jobs)
+    Path(log_dir).mkdir(parents=True, exist_ok=True)
+    print(f"🧮 Running {len(jobs)} jobs, {concurrent} at a time, {threads} threads each")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=concurrent) as pool:
+        futures = [pool.submit(run_job, n, job, threads, log_dir) for n, job in enumerate(jobs, 1)]
+        for future in as_completed(futures):
+            result = future.result()
+            icon = '✅' if result['status'] == 'ok' else '❌'
+            print(f"{icon} Job {result['job']}: {result['output']} ({result['seconds']:.1f}s)")
+            results.append(result)
+    return sorted(results, key=lambda r: r['job'])
+
+def main():
+    parser = argparse.ArgumentParser(description='Render many videos from a JSON or CSV manifest')
+    parser.add_argument('manifest', help='Path to a .json or .csv job manifest')
+    parser.add_argument('--jobs', type=int,
+                      help='Number of videos rendered at once (default: one per 4 CPU cores)')
+    parser.add_argument('--summary', default='batch_summary.json',
+                      help='Where to write the per-job result summary (default: batch_summary.json)')
+    parser.add_argument('--log-dir', default='batch_logs',
+                      help='Folder for per-job console logs (default: batch_logs)')
+    args = parser.parse_args()
+
+    try:
+        jobs = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {str(e)}")
+        return 1
+    if not jobs:
+        print("❌ Error: The manifest does not contain any jobs.")
+        return 1
+
+    start = time.perf_counter()
+    results = run_batch(jobs, args.jobs, args.log_dir)
+    failed = [r for r in results if r['status'] != 'ok']
+
+    summary = {
+        'total_seconds': round(time.perf_counter() - start, 2),
+        'succeeded': len(results) - len(failed),
+        'failed': len(failed),
+        'jobs': results,
+    }
+    with open(args.summary, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"\n📋 {summary['succeeded']} succeeded, {summary['failed']} failed in {summary['total_seconds']:.1f}s")
+    for result in failed:
+        print(f"   ❌ Job {result['job']}: {result['error']} (see {result['log']})")
+    print(f"📝 Summary written to: {args.summary}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
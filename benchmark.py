@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+Reproducible render benchmarks on synthetic inputs generated offline
+
+    python benchmark.py run --output results.json
+    python benchmark.py startup --output startup.json
+    python benchmark.py compare baseline.json results.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import wave
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import multiprocessing
+from pathlib import Path
+from contextlib import contextmanager, redirect_stdout, redirect_stderr
+import numpy as np
+from PIL import Image
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Benchmark cases: (name, renderer module, image count, image size, seconds per image)
+CASES = [
+    ('slideshow_5x720p', 'image_audio_to_video', 5, (1280, 720), 2),
+    ('slideshow_20x720p', 'image_audio_to_video', 20, (1280, 720), 2),
+    ('slideshow_5x12mp', 'image_audio_to_video', 5, (4000, 3000), 2),
+    ('single_12mp_60s', 'simple_video_creator', 1, (4000, 3000), 60),
+]
+QUICK_CASES = [
+    ('slideshow_3x720p', 'image_audio_to_video', 3, (1280, 720), 1),
+    ('single_720p_10s', 'simple_video_creator', 1, (1280, 720), 10),
+]
+
+# Functions timed as stages for each renderer ('module.function' for helpers the
+# renderer imports when it runs, bare names for renderer module globals)
+STAGES = {
+    'image_audio_to_video': ['render_plan.probe_duration', 'image_utils.preprocess_images_multi', 'prepare_audio',
+                             'render_slideshow'],
+    'simple_video_creator': ['image_utils.resize_image', 'render_plan.probe_duration', 'prepare_audio',
+                             'create_still_video'],
+}
+
+# CLI invocations that must not render: (name, script, arguments)
+STARTUP_CASES = [
+    ('slideshow_list_presets', 'image_audio_to_video.py', ['--list-presets']),
+    ('slideshow_check', 'image_audio_to_video.py', ['--check']),
+    ('slideshow_bad_preset', 'image_audio_to_video.py', ['--preset', 'nope']),
+    ('single_check', 'simple_video_creator.py', ['--image', 'data/image.jpg', '--audio', 'data/audio.wav', '--check']),
+]
+
+FPS = 24
+
+def create_test_image(path, size, seed):
+    """Write a deterministic photo-like JPEG (smooth gradients plus grain)"""
+    rng = np.random.default_rng(seed)
+    width, height = size
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    channels = []
+    for _ in range(3):
+        fx, fy, phase = rng.uniform(1, 6), rng.uniform(1, 6), rng.uniform(0, np.pi)
+        channels.append(127 + 100 * np.sin(x / width * fx + y / height * fy + phase))
+    image = np.stack(channels, axis=-1) + rng.normal(0, 12, (height, width, 1))
+    Image.fromarray(np.clip(image, 0, 255).astype(np.uint8)).save(path, 'JPEG', quality=90)
+
+def create_tone_file(path, duration, frequency=440, sample_rate=44100):
+    """Write a sine tone WAV file (same signal as demo.create_simple_tone)"""
+    t = np.linspace(0, duration, int(sample_rate * duration), endpoint=False)
+    samples = (np.sin(2 * np.pi * frequency * t) * 0.5 * 32767).astype(np.int16)
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.tobytes())
+
+@contextmanager
+def timed_stages(module, names, stages):
+    """Temporarily wrap module-level functions so their wall time lands in stages"""
+    targets = {}
+    for name in names:
+        owner = module
+        if '.' in name:
+            owner_name, name = name.rsplit('.', 1)
+            owner = __import__(owner_name)
+        targets[name] = (owner, getattr(owner, name))
+
+    def wrap(name, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stages[name] = stages.get(name, 0) + time.perf_counter() - start
+        return timed
+
+    for name, (owner, func) in targets.items():
+        setattr(owner, name, wrap(name, func))
+    try:
+        yield stages
+    finally:
+        for name, (owner, func) in targets.items():
+            setattr(owner, name, func)
+
+def peak_rss_mb():
+    """Peak resident memory of this process and its finished children, in MB"""
+    if resource is None:
+        return None
+    unit = 1 if sys.platform == 'darwin' else 1024  # ru_maxrss is bytes on macOS, KB elsewhere
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) * unit / (1024 * 1024), 1)
+
+def run_case(case, work_dir):
+    """Generate the fixtures for one case and render it, returning its metrics"""
+    name, module_name, count, size, seconds_per_image = case
+    work_dir = Path(work_dir)
+    image_paths = []
+    for i in range(count):
+        path = work_dir / f'{name}_{i:03d}.jpg'
+        create_test_image(path, size, seed=i)
+        image_paths.append(str(path))
+    duration = count * seconds_per_image
+    audio_path = work_dir / f'{name}.wav'
+    create_tone_file(audio_path, duration)
+    output_path = str(work_dir / f'{name}.mp4')
+
+    module = __import__(module_name)
+    stages = {}
+    log = io.StringIO()
+    start = time.perf_counter()
+    with timed_stages(module, STAGES[module_name], stages), redirect_stdout(log), redirect_stderr(log):
+        if module_name == 'simple_video_creator':
+            module.create_video(image_paths[0], str(audio_path), output_path, audio_cache_dir=None)
+        else:
+            module.create_video(
+                image_paths, str(audio_path), output_path,
+                duration_per_image=seconds_per_image, cache_dir=None, audio_cache_dir=None,
+                segment_cache_dir=None
+            )
+    total = time.perf_counter() - start
+
+    return {
+        'total_s': round(total, 3),
+        'stages_s': {stage: round(elapsed, 3) for stage, elapsed in stages.items()},
+        'fps': round(duration * FPS / total, 1),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def _case_worker(case, work_dir, queue):
+    """Run one case in a fresh process so peak memory is measured per case"""
+    try:
+        queue.put(run_case(case, work_dir))
+    except Exception as e:
+        queue.put({'error': str(e)})
+
+def run_suite(cases, repeat=1):
+    """Run every case (best of `repeat` runs) and return the results"""
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='benchmark_') as work_dir:
+        for case in cases:
+            runs = []
+            for _ in range(repeat):
+                queue = context.Queue()
+                process = context.Process(target=_case_worker, args=(case, work_dir, queue))
+                process.start()
+                runs.append(queue.get())
+                process.join()
+            failed = [r for r in runs if 'error' in r]
+            best = failed[0] if failed else min(runs, key=lambda r: r['total_s'])
+            results[case[0]] = best
+            if 'error' in best:
+                print(f"❌ {case[0]}: {best['error']}")
+            else:
+                print(f"⏱️  {case[0]:22} {best['total_s']:8.2f}s {best['fps']:8.1f} fps {best['peak_rss_mb']} MB")
+    return results
+
+def run_startup(repeat=10):
+    """Time CLI calls that only validate, returning the median wall time of each"""
+    package_dir = Path(__file__).resolve().parent
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='benchmark_startup_') as work_dir:
+        data_dir = Path(work_dir) / 'data'
+        data_dir.mkdir()
+        create_test_image(data_dir / 'image.jpg', (640, 360), seed=0)
+        create_tone_file(data_dir / 'audio.wav', 5)
+        for name, script, arguments in STARTUP_CASES:
+            command = [sys.executable, str(package_dir / script)] + arguments
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                subprocess.run(command, cwd=work_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                times.append(time.perf_counter() - start)
+            results[name] = {'total_s': round(statistics.median(times), 4), 'min_s': round(min(times), 4)}
+            print(f"⏱️  {name:22} {results[name]['total_s'] * 1000:8.1f} ms (median of {repeat})")
+    return results
+
+def compare_results(baseline, current, threshold=0.10):
+    """Return (case, metric, old, new) for every metric that got worse by more than threshold"""
+    regressions = []
+    for case, new in current.get('results', {}).items():
+        old = baseline.get('results', {}).get(case)
+        if not old or 'error' in old or 'error' in new:
+            continue
+        checks = [('total_s', True), ('peak_rss_mb', True), ('fps', False)]
+        checks += [(f'stages_s.{stage}', True) for stage in old.get('stages_s', {})]
+        for metric, lower_is_better in checks:
+            old_value, new_value = _metric(old, metric), _metric(new, metric)
+            if not old_value or new_value is None:
+                continue
+            change = (new_value - old_value) / old_value
+            if (change if lower_is_better else -change) > threshold:
+                regressions.append((case, metric, old_value, new_value))
+    return regressions
+
+def _metric(result, metric):
+    value = result
+    for key in metric.split('.'):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the video renderers on synthetic inputs')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run the benchmark suite')
+    run_parser.add_argument('--output', default='benchmark_results.json',
+                          help='Where to save the results (default: benchmark_results.json)')
+    run_parser.add_argument('--quick', action='store_true', help='Run a small, fast subset of cases')
+    run_parser.add_argument('--repeat', type=int, default=1, help='Runs per case, best time is kept (default: 1)')
+
+    startup_parser = subparsers.add_parser('startup', help='Time CLI calls that validate without rendering')
+    startup_parser.add_argument('--output', default='startup_results.json',
+                              help='Where to save the results (default: startup_results.json)')
+    startup_parser.add_argument('--repeat', type=int, default=10,
+                              help='Runs per case, the median is kept (default: 10)')
+
+    compare_parser = subparsers.add_parser('compare', help='Flag regressions against a stored baseline')
+    compare_parser.add_argument('baseline', help='Baseline results JSON')
+    compare_parser.add_argument('current', help='New results JSON')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                              help='Allowed slowdown before a metric is flagged (default: 0.10 = 10%%)')
+
+    args = parser.parse_args()
+
+    if args.command in ('run', 'startup'):
+        results = {
+            'meta': {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+            },
+            'results': (run_startup(args.repeat) if args.command == 'startup'
+                        else run_suite(QUICK_CASES if args.quick else CASES, args.repeat)),
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"📝 Results written to: {args.output}")
+        return 1 if any('error' in r for r in results['results'].values()) else 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+    regressions = compare_results(baseline, current, args.threshold)
+    if not regressions:
+        print(f"✅ No regressions above {args.threshold:.0%}")
+        return 0
+    print(f"❌ {len(regressions)} regressions above {args.threshold:.0%}:")
+    for case, metric, old_value, new_value in regressions:
+        print(f"   {case:22} {metric:32} {old_value:>10} -> {new_value}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
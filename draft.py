@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Draft Previews
+Settings and extras for quick --draft renders
+
+A draft renders the same timeline as the final video at a fraction of the
+size and frame rate with the fastest x264 preset. The images are still
+letterboxed at full size through the frame cache and then scaled down, so
+the final render finds them already cached. Contact sheets and GIF strips
+are cut from the encoded draft with one ffmpeg pass each.
+"""
+
+import math
+from pathlib import Path
+from ffmpeg_utils import run_ffmpeg
+
+DRAFT_FPS = 12
+DRAFT_MAX_SIDE = 640
+DRAFT_ENCODER_PRESET = 'ultrafast'
+MAX_KEY_FRAMES = 48
+SHEET_TILE_WIDTH = 320
+GIF_WIDTH = 320
+GIF_FPS = 2
+
+def draft_size(width, height, max_side=DRAFT_MAX_SIDE):
+    """Scale a frame size down by a whole factor until its longer side fits max_side (kept even)"""
+    factor = max(1, math.ceil(max(width, height) / max_side))
+    return max(2, width // factor // 2 * 2), max(2, height // factor // 2 * 2)
+
+def draft_output_path(output_path):
+    """Where a draft of output_path goes (video.mp4 -> video_draft.mp4)"""
+    output_path = Path(output_path)
+    return output_path.with_name(f'{output_path.stem}_draft{output_path.suffix}')
+
+def scale_frame(frame, size):
+    """Scale a full-size letterboxed frame down to the draft size"""
+    import numpy as np
+    from PIL import Image
+    if (frame.shape[1], frame.shape[0]) == tuple(size):
+        return frame
+    return np.asarray(Image.fromarray(np.asarray(frame)).resize(size, Image.Resampling.BOX))
+
+def key_frames(n_images, frames_per_image, limit=MAX_KEY_FRAMES):
+    """Frame number in the middle of each image's time on screen, thinned out evenly to at most limit"""
+    if n_images <= limit:
+        picks = range(n_images)
+    else:
+        picks = sorted({round(k * (n_images - 1) / (limit - 1)) for k in range(limit)})
+    return [i * frames_per_image + frames_per_image // 2 for i in picks]
+
+def spaced_frames(n_frames, count=12):
+    """count frame numbers spread evenly over a video of n_frames frames"""
+    count = max(1, min(count, n_frames))
+    return [int((k + 0.5) * n_frames / count) for k in range(count)]
+
+def _select_filter(frame_numbers):
+    """ffmpeg select filter that keeps only the given frame numbers"""
+    return "select='" + '+'.join(f'eq(n,{n})' for n in frame_numbers) + "'"
+
+def write_contact_sheet(video_path, frame_numbers, output_path, tile_width=SHEET_TILE_WIDTH):
+    """Tile the given frames of a video into one PNG, left to right and top to bottom"""
+    columns = min(len(frame_numbers), 6)
+    rows = math.ceil(len(frame_numbers) / columns)
+    run_ffmpeg(['-i', video_path, '-vf',
+                f"{_select_filter(frame_numbers)},scale={tile_width}:-2,tile={columns}x{rows}:padding=4:margin=4",
+                '-frames:v', 1, str(output_path)])
+
+def write_gif(video_path, frame_numbers, output_path, width=GIF_WIDTH, fps=GIF_FPS):
+    """Animate the given frames of a video as a GIF strip with its own palette"""
+    run_ffmpeg(['-i', video_path, '-an', '-filter_complex',
+                f"{_select_filter(frame_numbers)},setpts=N/{fps}/TB,scale={width}:-2:flags=lanczos,"
+                f"split[a][b];[a]palettegen[p];[b][p]paletteuse",
+                '-r', fps, str(output_path)])
+
+def write_extras(video_path, frame_numbers, sheet=False, gif=False):
+    """Write the requested contact sheet and/or GIF next to a draft video and return their paths"""
+    written = []
+    if sheet:
+        path = Path(video_path).with_suffix('.png')
+        write_contact_sheet(video_path, frame_numbers, path)
+        written.append(path)
+    if gif:
+        path = Path(video_path).with_suffix('.gif')
+        write_gif(video_path, frame_numbers, path)
+        written.append(path)
+    return written
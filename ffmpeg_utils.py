@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+FFmpeg Utilities
+Thin wrappers around the ffmpeg binary used by the fast rendering paths
+"""
+
+import os
+import re
+import time
+import subprocess
+from pathlib import Path
+import profiler
+
+# A static image is encoded once as a short closed GOP of this length and the
+# resulting file is repeated with stream copy to fill the full duration
+STILL_UNIT_SECONDS = 2
+
+def get_ffmpeg_binary():
+    """Locate the ffmpeg binary (same lookup order as moviepy)"""
+    binary = os.environ.get('FFMPEG_BINARY')
+    if binary and binary != 'ffmpeg-imageio':
+        return binary
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return 'ffmpeg'
+
+def run_ffmpeg(args, input_data=None):
+    """Run ffmpeg with the given arguments, raising RuntimeError on failure"""
+    cmd = [get_ffmpeg_binary(), '-y', '-hide_banner', '-loglevel', 'error']
+    cmd += [str(arg) for arg in args]
+    result = subprocess.run(cmd, input=input_data, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        message = result.stderr.decode(errors='replace').strip()
+        raise RuntimeError(f"ffmpeg failed: {message[-500:]}")
+
+def probe_duration(media_path):
+    """Read the duration of a media file in seconds"""
+    with profiler.span('probe duration'):
+        result = subprocess.run(
+            [get_ffmpeg_binary(), '-hide_banner', '-i', str(media_path)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+    match = re.search(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', result.stderr.decode(errors='replace'))
+    if not match:
+        raise RuntimeError(f"Could not read duration of {media_path}")
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+def video_encoder_args(fps, preset='fast', threads=None):
+    """Encoder arguments shared by every segment of a render.
+
+    All segments must be encoded with identical settings so they can be joined
+    with the concat demuxer without re-encoding. B-frames are disabled so every
+    segment starts and ends cleanly on its own frames.
+    """
+    args = [
+        '-c:v', 'libx264',
+        '-preset', preset,
+        '-tune', 'stillimage',
+        '-pix_fmt', 'yuv420p',
+        '-bf', '0',
+        '-g', int(fps * STILL_UNIT_SECONDS),
+        '-r', fps,
+    ]
+    if threads:
+        args += ['-threads', threads]
+    return args
+
+def raw_input_args(width, height, fps, pix_fmt='rgb24'):
+    """Input arguments for raw frames (rgb24 or yuv420p) written to ffmpeg's stdin"""
+    return ['-f', 'rawvideo', '-pix_fmt', pix_fmt, '-s', f'{width}x{height}', '-framerate', fps, '-i', 'pipe:0']
+
+def encode_still(frame, n_frames, fps, output_path, preset='fast', threads=None):
+    """Encode a single RGB frame repeated n_frames times"""
+    height, width = frame.shape[:2]
+    with profiler.span('encode still', 'encoder', frames=n_frames):
+        run_ffmpeg(
+            raw_input_args(width, height, fps)
+            + ['-vf', 'loop=loop=-1:size=1:start=0', '-frames:v', n_frames]
+            + video_encoder_args(fps, preset, threads)
+            + [str(output_path)],
+            input_data=frame.tobytes()
+        )
+
+def encode_still_segment(frame, n_frames, fps, work_dir, name, preset='fast', threads=None):
+    """Encode a static segment and return the list of files that make it up.
+
+    Only one short unit (plus a remainder) is ever encoded, so the cost does not
+    depend on how long the image stays on screen.
+    """
+    work_dir = Path(work_dir)
+    unit_frames = int(fps * STILL_UNIT_SECONDS)
+    if n_frames <= unit_frames:
+        path = work_dir / f'{name}.mp4'
+        encode_still(frame, n_frames, fps, path, preset, threads)
+        return [path]
+
+    repeats, remainder = divmod(n_frames, unit_frames)
+    unit_path = work_dir / f'{name}_unit.mp4'
+    encode_still(frame, unit_frames, fps, unit_path, preset, threads)
+    parts = [unit_path] * repeats
+    if remainder:
+        rest_path = work_dir / f'{name}_rest.mp4'
+        encode_still(frame, remainder, fps, rest_path, preset, threads)
+        parts.append(rest_path)
+    return parts
+
+def encode_audio(audio_path, output_path):
+    """Encode an audio file to AAC so it can be muxed into several outputs with stream copy"""
+    with profiler.span('encode audio', 'encoder'):
+        run_ffmpeg(['-i', audio_path, '-vn', '-c:a', 'aac', str(output_path)])
+
+def concat_segments(segment_paths, output_path, work_dir, audio_path=None, duration=None, audio_codec='aac'):
+    """Join encoded segments with stream copy and mux the audio in the same pass"""
+    list_path = Path(work_dir) / 'segments.txt'
+    with open(list_path, 'w', encoding='utf-8') as f:
+        for path in segment_paths:
+            escaped = str(Path(path).resolve()).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    args = ['-f', 'concat', '-safe', '0', '-i', list_path]
+    if audio_path:
+        args += ['-i', audio_path, '-map', '0:v:0', '-map', '1:a:0', '-c:a', audio_codec]
+    args += ['-c:v', 'copy']
+    if duration:
+        args += ['-t', f'{duration:.3f}']
+    with profiler.span('concat + mux', 'encoder', segments=len(segment_paths)):
+        run_ffmpeg(args + [str(output_path)])
+
+def encode_frames(frames, width, height, fps, output_path, preset='fast', threads=None, pix_fmt='rgb24',
+                  audio_path=None, duration=None, audio_codec='copy'):
+    """Stream raw frames from an iterable into an ffmpeg encoder.
+
+    Each frame is written straight from its own memory, so a generator that
+    reuses one buffer costs no copies. Writes block while ffmpeg is busy,
+    which keeps at most a frame or two in flight. With audio_path the audio
+    is muxed in the same pass.
+    """
+    args = raw_input_args(width, height, fps, pix_fmt)
+    if audio_path:
+        args += ['-i', audio_path, '-map', '0:v:0', '-map', '1:a:0', '-c:a', audio_codec]
+    args += video_encoder_args(fps, preset, threads)
+    if duration:
+        args += ['-t', f'{duration:.3f}']
+    cmd = [get_ffmpeg_binary(), '-y', '-hide_banner', '-loglevel', 'error']
+    cmd += [str(arg) for arg in args]
+    cmd.append(str(output_path))
+    start = time.perf_counter()
+    stats = None
+    process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        if profiler.enabled():
+            stats = _write_frames_profiled(process, frames)
+        else:
+            for frame in frames:
+                process.stdin.write(_frame_bytes(frame))
+        process.stdin.close()
+    except BrokenPipeError:
+        pass
+    except BaseException:
+        # The frames failed (decode error, Ctrl+C): stop ffmpeg before it finishes a truncated video
+        process.kill()
+        process.wait()
+        process.stderr.close()
+        Path(output_path).unlink(missing_ok=True)
+        raise
+    stderr = process.stderr.read()
+    if process.wait() != 0:
+        message = stderr.decode(errors='replace').strip()
+        raise RuntimeError(f"ffmpeg failed: {message[-500:]}")
+    
+    if stats:
+        n_frames, generate, wait = stats
+        end = time.perf_counter()
+        profiler.add_span('encode frames', start, end, 'encoder', frames=n_frames,
+                          fps=round(n_frames / (end - start), 1),
+                          generate_s=round(generate, 4), write_wait_s=round(wait, 4))
+        profiler.count('frames piped to encoder', n_frames)
+        profiler.count('frame generation (s)', generate)
+        profiler.count('encoder write wait (s)', wait)
+
+def _frame_bytes(frame):
+    """The frame's own memory when it is contiguous, otherwise a packed copy"""
+    return frame.data if frame.flags.c_contiguous else frame.tobytes()
+
+def _write_frames_profiled(process, frames):
+    """encode_frames loop that also measures frame generation and encoder back-pressure"""
+    generate = wait = 0.0
+    n_frames = 0
+    frames = iter(frames)
+    while True:
+        t0 = time.perf_counter()
+        frame = next(frames, None)
+        t1 = time.perf_counter()
+        if frame is None:
+            break
+        process.stdin.write(_frame_bytes(frame))
+        generate += t1 - t0
+        wait += time.perf_counter() - t1
+        n_frames += 1
+    return n_frames, generate, wait
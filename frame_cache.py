@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Frame Cache
+Content-addressed on-disk cache for resized/letterboxed frames
+"""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+import hashlib
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    'VIDEO_GENERATOR_CACHE', Path.home() / '.cache' / 'video_generator'
+)) / 'frames'
+DEFAULT_CACHE_SIZE_MB = 2048
+INDEX_NAME = 'index.json'
+
+def file_hash(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_key(content_hash, target_size, method, background):
+    """Key a frame on its source's file_hash and every setting that affects its pixels"""
+    method_name = getattr(method, 'name', method)
+    settings = f'{target_size[0]}x{target_size[1]}|{method_name}|{tuple(background)}'
+    return hashlib.sha256(f'{content_hash}|{settings}'.encode()).hexdigest()
+
+def load_cached_frame(cache_dir, key):
+    """Return the cached frame for key, or None on a miss"""
+    import numpy as np
+    path = Path(cache_dir) / f'{key}.npy'
+    try:
+        return np.load(path)
+    except (OSError, ValueError):
+        return None
+
+def temp_file(cache_dir, suffix='.tmp'):
+    """Create an empty temp file in cache_dir that no other writer (thread or process) shares"""
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=suffix)
+    os.close(fd)
+    return temp_path
+
+def store_frame(cache_dir, key, frame):
+    """Write a frame to the cache atomically (safe with concurrent writers, threads included)"""
+    import numpy as np
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    temp_path = temp_file(cache_dir)
+    with open(temp_path, 'wb') as f:
+        np.save(f, frame)
+    os.replace(temp_path, cache_dir / f'{key}.npy')
+
+def _read_index(cache_dir):
+    try:
+        with open(Path(cache_dir) / INDEX_NAME, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_index(cache_dir, index):
+    temp_path = temp_file(cache_dir)
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    os.replace(temp_path, Path(cache_dir) / INDEX_NAME)
+
+def touch_entries(cache_dir, keys, max_size_mb=DEFAULT_CACHE_SIZE_MB):
+    """Mark keys as recently used, then evict least recently used frames over the size cap"""
+    cache_dir = Path(cache_dir)
+    if not cache_dir.exists():
+        return
+    index = _read_index(cache_dir)
+    now = time.time()
+
+    # Entries written by other processes show up as files missing from the index
+    for path in cache_dir.glob('*.npy'):
+        if path.stem not in index:
+            index[path.stem] = {'bytes': path.stat().st_size, 'last_used': path.stat().st_mtime}
+    for key in keys:
+        if key in index:
+            index[key]['last_used'] = now
+
+    total = sum(entry['bytes'] for entry in index.values())
+    for key in sorted(index, key=lambda k: index[k]['last_used']):
+        if total <= max_size_mb * 1024 * 1024:
+            break
+        total -= index[key]['bytes']
+        (cache_dir / f'{key}.npy').unlink(missing_ok=True)
+        del index[key]
+
+    # Forget entries whose files were removed by hand
+    index = {key: entry for key, entry in index.items() if (cache_dir / f'{key}.npy').exists()}
+    _write_index(cache_dir, index)
+
+def clear_cache(cache_dir=DEFAULT_CACHE_DIR):
+    """Delete every cached frame"""
+    shutil.rmtree(cache_dir, ignore_errors=True)
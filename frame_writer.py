@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Frame Writer
+Stream rendered frames straight into ffmpeg without moviepy's writer
+
+moviepy's write_videofile converts every frame to a new uint8 array and then
+copies it again into a bytes object before it reaches the pipe. The pipe
+writer hands ffmpeg the frame's own memory, or one preallocated buffer when
+a conversion is needed. With pix_fmt='yuv420p' frames are converted in
+NumPy, which halves the bytes sent through the pipe.
+
+NumPy is imported inside the functions that need it so the CLIs can read
+WRITERS and PIPE_FORMATS without paying for it.
+"""
+
+from ffmpeg_utils import encode_frames
+import profiler
+
+WRITERS = ('moviepy', 'pipe')
+PIPE_FORMATS = ('rgb24', 'yuv420p')
+
+def rgb_to_yuv420p(frame, out, work):
+    """Convert an RGB frame into out, a flat yuv420p buffer (BT.601, limited range).
+
+    work holds the 16-bit scratch arrays from yuv420p_buffers(), so no memory is
+    allocated per frame. Width and height must be even.
+    """
+    import numpy as np
+    height, width = frame.shape[:2]
+    luma, temp, row_pairs, rgb_half, chroma, chroma_temp = work
+
+    # Y = (66 R + 129 G + 25 B + 128) >> 8 + 16, which never exceeds 16 bits
+    np.multiply(frame[..., 0], 66, out=luma, dtype=np.uint16)
+    np.multiply(frame[..., 1], 129, out=temp, dtype=np.uint16)
+    luma += temp
+    np.multiply(frame[..., 2], 25, out=temp, dtype=np.uint16)
+    luma += temp
+    luma += 128 + (16 << 8)
+    luma >>= 8
+    np.copyto(out[:width * height].reshape(height, width), luma, casting='unsafe')
+
+    # Chroma from the rounded mean of each 2x2 block
+    np.add(frame[0::2], frame[1::2], out=row_pairs, dtype=np.int16)
+    pixel_pairs = row_pairs.reshape(height // 2, width // 2, 2, 3)
+    np.add(pixel_pairs[:, :, 0], pixel_pairs[:, :, 1], out=rgb_half)
+    rgb_half += 2
+    rgb_half >>= 2
+    r, g, b = rgb_half[..., 0], rgb_half[..., 1], rgb_half[..., 2]
+    plane = (width // 2) * (height // 2)
+    for offset, (kr, kg, kb) in ((width * height, (-38, -74, 112)), (width * height + plane, (112, -94, -18))):
+        np.multiply(r, kr, out=chroma)
+        np.multiply(g, kg, out=chroma_temp)
+        chroma += chroma_temp
+        np.multiply(b, kb, out=chroma_temp)
+        chroma += chroma_temp
+        chroma += 128
+        chroma >>= 8
+        chroma += 128
+        np.copyto(out[offset:offset + plane].reshape(height // 2, width // 2), chroma, casting='unsafe')
+    return out
+
+def yuv420p_buffers(width, height):
+    """Allocate the output buffer and scratch arrays used by rgb_to_yuv420p"""
+    import numpy as np
+    if width % 2 or height % 2:
+        raise ValueError(f"yuv420p needs an even frame size, got {width}x{height}")
+    out = np.empty(width * height * 3 // 2, np.uint8)
+    work = (
+        np.empty((height, width), np.uint16),
+        np.empty((height, width), np.uint16),
+        np.empty((height // 2, width, 3), np.int16),
+        np.empty((height // 2, width // 2, 3), np.int16),
+        np.empty((height // 2, width // 2), np.int16),
+        np.empty((height // 2, width // 2), np.int16),
+    )
+    return out, work
+
+def clip_frames(clip, fps, n_frames):
+    """Yield uint8 RGB frames of a moviepy clip, reusing one buffer for converted frames"""
+    import numpy as np
+    buffer = None
+    for i in range(n_frames):
+        frame = clip.get_frame(i / fps)
+        if frame.dtype != np.uint8 or frame.ndim != 3 or frame.shape[2] != 3 or not frame.flags.c_contiguous:
+            if buffer is None:
+                buffer = np.empty(frame.shape[:2] + (3,), np.uint8)
+            np.copyto(buffer, frame[..., :3] if frame.ndim == 3 else frame[..., None], casting='unsafe')
+            frame = buffer
+        yield frame
+
+def yuv420p_frames(frames, width, height):
+    """Convert RGB frames to yuv420p, yielding the same preallocated buffer every time"""
+    out, work = yuv420p_buffers(width, height)
+    for frame in frames:
+        yield rgb_to_yuv420p(frame, out, work)
+
+def write_frames(frames, width, height, fps, output_path, pix_fmt='rgb24', **encode_args):
+    """Pipe RGB frames into ffmpeg as rgb24 or yuv420p (extra arguments go to encode_frames)"""
+    if pix_fmt == 'yuv420p':
+        frames = yuv420p_frames(frames, width, height)
+    elif pix_fmt != 'rgb24':
+        raise ValueError(f"Unknown pipe format '{pix_fmt}'. Choose from: {', '.join(PIPE_FORMATS)}")
+    encode_frames(frames, width, height, fps, output_path, pix_fmt=pix_fmt, **encode_args)
+
+def write_clip(clip, output_path, fps=24, audio_path=None, preset='fast', threads=None, pix_fmt='rgb24'):
+    """Render a moviepy clip with the pipe writer (audio_path must be AAC, it is stream-copied)"""
+    n_frames = round(clip.duration * fps)
+    width, height = clip.size
+    with profiler.span('pipe writer', 'encoder', frames=n_frames, pix_fmt=pix_fmt):
+        write_frames(
+            clip_frames(clip, fps, n_frames), width, height, fps, output_path, pix_fmt,
+            preset=preset, threads=threads, audio_path=audio_path, duration=n_frames / fps
+        )
@@ -2,140 +2,376 @@
 """
 Simple Video Creator
 Automatically processes files from a 'data' folder and saves to 'output' folder
+
+moviepy, NumPy and Pillow are imported only once a render starts, so
+--list-presets, --check and argument errors return quickly.
 """
 
 import os
-import glob
+import sys
+import shutil
+import tempfile
 from pathlib import Path
-from moviepy.editor import ImageClip, AudioFileClip, concatenate_videoclips
-from PIL import Image, ImageOps
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from ffmpeg_utils import probe_duration
+from audio_utils import DEFAULT_AUDIO_CACHE_DIR, prepare_audio, clear_audio_cache
+from segment_renderer import render_slideshow
+from render_plan import (VIDEO_PRESETS, DEFAULT_FPS, DEFAULT_ENCODER_PRESET, preset_output_path,
+                         find_media, compile_plan, unique_outputs, decode_sources, lazy_sources,
+                         print_timeline)
+from transitions import TRANSITIONS
+from ken_burns import MOTIONS
+from frame_writer import WRITERS, PIPE_FORMATS, write_clip
+import profiler
+from frame_cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE_MB, clear_cache
+from segment_cache import DEFAULT_SEGMENT_CACHE_DIR, clear_segment_cache
+from watch_mode import watch
 
-# Video presets (width, height, description)
-VIDEO_PRESETS = {
-    'youtube': (1920, 1080, 'YouTube HD (16:9)'),
-    'youtube_short': (1080, 1920, 'YouTube Shorts (9:16)'),
-    'tiktok': (1080, 1920, 'TikTok (9:16)'),
-    'instagram_post': (1080, 1080, 'Instagram Post (1:1)'),
-    'instagram_story': (1080, 1920, 'Instagram Story (9:16)'),
-    'facebook': (1280, 720, 'Facebook (16:9)')
-}
-
-def find_files_in_data():
-    """Find image and audio files in the data folder"""
-    data_dir = Path('data')
-    if not data_dir.exists():
-        data_dir.mkdir(parents=True, exist_ok=True)
-        raise FileNotFoundError("'data' folder not found. I've created it for you. Please add your files and run again.")
-    
-    # Find all image files
-    image_exts = ('*.jpg', '*.jpeg', '*.png', '*.bmp')
-    image_files = []
-    for ext in image_exts:
-        image_files.extend(sorted(glob.glob(str(data_dir / ext), recursive=True)))
-    
-    # Find first audio file
-    audio_exts = ('*.mp3', '*.wav', '*.m4a')
-    audio_file = None
-    for ext in audio_exts:
-        audio_files = glob.glob(str(data_dir / ext))
-        if audio_files:
-            audio_file = audio_files[0]  # Use first audio file found
-            break
-    
-    if not image_files:
-        raise FileNotFoundError("No image files found in the 'data' folder.")
-    if not audio_file:
-        raise FileNotFoundError("No audio file found in the 'data' folder.")
-    
-    return image_files, audio_file
-
-def resize_image(image_path, target_size):
-    """Resize image to fit target size while maintaining aspect ratio"""
-    img = Image.open(image_path)
-    img = ImageOps.contain(img, target_size, method=Image.Resampling.LANCZOS)
-    
-    # Create new image with target size and paste the resized image
-    new_img = Image.new('RGB', target_size, (0, 0, 0))  # Black background
-    new_img.paste(
-        img, 
-        ((target_size[0] - img.size[0]) // 2, (target_size[1] - img.size[1]) // 2)
-    )
-    return new_img
-
-def create_video(image_paths, audio_path, output_path, preset='youtube', custom_size=None, duration_per_image=5, transition_duration=0.5):
-    """Create a video from multiple images and audio"""
-    # Get dimensions
-    if preset == 'custom' and custom_size and len(custom_size) == 2:
-        width, height = custom_size
-        preset_name = f'Custom ({width}x{height})'
-    else:
-        width, height, preset_name = VIDEO_PRESETS.get(preset, VIDEO_PRESETS['youtube'])
-    
-    print(f"🎥 Creating {preset_name} video: {width}x{height}")
-    print(f"📸 Found {len(image_paths)} images")
-    print(f"🔊 Using audio: {os.path.basename(audio_path)}")
-    
-    # Load audio
-    audio = AudioFileClip(audio_path)
-    audio_duration = audio.duration
-    print(f"⏱️  Audio duration: {audio_duration:.1f} seconds")
-    
-    # Calculate duration per image
-    if duration_per_image == 0:  # Auto-calculate duration
-        duration_per_image = max(3, audio_duration / len(image_paths))
-        print(f"⏱️  Auto-calculated {duration_per_image:.1f} seconds per image")
-    
-    # Create video clips from images
-    clips = []
-    for i, img_path in enumerate(image_paths, 1):
-        print(f"🖼️  Processing image {i}/{len(image_paths)}: {os.path.basename(img_path)}")
-        
-        # Resize image
-        resized_img = resize_image(img_path, (width, height))
-        temp_img_path = f'temp_img_{i}.jpg'
-        resized_img.save(temp_img_path, 'JPEG', quality=95)
-        
-        # Create clip
-        clip = ImageClip(temp_img_path).set_duration(duration_per_image)
+def create_video(image_paths, audio_path, output_path, preset='youtube', custom_size=None,
+                 duration_per_image=5, transition_duration=0.5, renderer='segments',
+                 spill_to_disk=False, workers=None, cache_dir=DEFAULT_CACHE_DIR,
+                 cache_size_mb=DEFAULT_CACHE_SIZE_MB, threads=4,
+                 audio_cache_dir=DEFAULT_AUDIO_CACHE_DIR, chunks=1, transition_style='crossfade',
+                 writer='moviepy', pipe_format='rgb24', segment_cache_dir=DEFAULT_SEGMENT_CACHE_DIR,
+                 lyrics_path=None, lyrics_font=None, lyrics_size=None, lazy=False, motion=None, motion_file=None,
+                 draft=False, draft_sheet=False, draft_gif=False, fps=DEFAULT_FPS):
+    """Create a video from multiple images and audio.
+
+    With lazy=True images are decoded while the video renders and only a few
+    frames are kept in memory at any time. motion (a ken_burns motion name)
+    and/or motion_file turn on Ken Burns pan and zoom. draft=True renders the
+    same timeline small, at a low frame rate and with the fastest encoder
+    settings, optionally with a contact sheet and/or GIF of key frames.
+    """
+    from image_utils import print_timing_report
+    
+    # Resolve sizes, timing, sources and timeline up front
+    plan = compile_plan(image_paths, audio_path, output_path, [preset], custom_size, duration_per_image,
+                        transition_duration, transition_style, fps=fps, motion=motion, motion_file=motion_file,
+                        draft=draft)
+    output = plan.outputs[0]
+    print(f"🎥 Creating {output.description} video: {output.size[0]}x{output.size[1]}")
+    print_sources(plan, duration_per_image == 0)
+    
+    # Create output directory if it doesn't exist
+    output_path = output.path
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    if draft:
+        print(f"📝 Draft: {output.frame_size[0]}x{output.frame_size[1]} @ {plan.fps} fps, x264 {plan.encoder_preset}")
+    if plan.motions:
+        print(f"🎞️  Ken Burns motion from {output.render_size[0]}x{output.render_size[1]} buffers")
+    
+    # Resize images in memory (optionally spilled to disk as lossless .npy, or decoded on demand)
+    spill_dir = tempfile.mkdtemp(prefix='frames_') if spill_to_disk else None
+    frames = None
+    try:
+        if lazy:
+            print(f"🖼️  Decoding {len(image_paths)} images while rendering...")
+            frames = lazy_sources(plan, cache_dir)[0]
+        else:
+            print(f"🖼️  Processing {len(plan.sources)} images...")
+            frames = decode_sources(plan, workers, cache_dir, cache_size_mb)[0]
+        if spill_dir:
+            frames = spill_frames(frames, spill_dir)
         
-        # Add crossfade transition (except for first clip)
-        if i > 1 and transition_duration > 0:
-            clip = clip.crossfadein(transition_duration)
+        with tempfile.TemporaryDirectory(prefix='audio_') as work_dir:
+            # Stream-copy AAC input, otherwise reuse (or create) a cached AAC encode
+            print("🔊 Preparing audio...")
+            prepared_audio = prepare_audio(audio_path, work_dir, audio_cache_dir)
+            
+            if renderer == 'segments':
+                overlays = None
+                if lyrics_path:
+                    from lyrics import lyric_overlays
+                    overlays = lyric_overlays(lyrics_path, output.frame_size, plan.fps, plan.video_frames,
+                                              lyrics_font, lyrics_size)
+                
+                # Fast path: encode static stretches once, render only the crossfades
+                print(f"🚀 Rendering segments to: {output_path}")
+                reused, total = render_slideshow(
+                    frames,
+                    plan.timeline,
+                    prepared_audio,
+                    str(output_path),
+                    fps=plan.fps,
+                    preset=plan.encoder_preset,
+                    threads=threads,
+                    audio_codec='copy',
+                    chunks=chunks,
+                    segment_cache_dir=segment_cache_dir,
+                    overlays=overlays,
+                    motions=plan.motions,
+                    frame_size=output.frame_size
+                )
+                if reused:
+                    print(f"♻️  Reused {reused} of {total} encoded segments from the cache")
+                if draft_sheet or draft_gif:
+                    from draft import key_frames, write_extras
+                    frame_numbers = key_frames(len(frames), plan.frames_per_image)
+                    for path in write_extras(output_path, frame_numbers, draft_sheet, draft_gif):
+                        print(f"🖼️  Key frames saved to: {path}")
+            else:
+                render_with_moviepy(frames, prepared_audio, output_path, plan.duration_per_image,
+                                    plan.transition_duration, threads, writer, pipe_format, plan.fps,
+                                    plan.encoder_preset)
+    finally:
+        if lazy and frames is not None:
+            frames.close(cache_size_mb)
+            if frames.results:
+                print_timing_report(*frames.timing_report())
+        frames = None
+        if spill_dir:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+    
+    print(f"✅ Video saved to: {output_path}")
+
+def create_videos(image_paths, audio_path, output_path, presets, custom_size=None,
+                  duration_per_image=5, transition_duration=0.5, workers=None,
+                  cache_dir=DEFAULT_CACHE_DIR, cache_size_mb=DEFAULT_CACHE_SIZE_MB, threads=4,
+                  audio_cache_dir=DEFAULT_AUDIO_CACHE_DIR, transition_style='crossfade',
+                  segment_cache_dir=DEFAULT_SEGMENT_CACHE_DIR, lyrics_path=None, lyrics_font=None, lyrics_size=None,
+                  lazy=False, motion=None, motion_file=None, draft=False, draft_sheet=False, draft_gif=False,
+                  fps=DEFAULT_FPS, chunks=1, spill_to_disk=False):
+    """Create one video per preset, decoding the images and encoding the audio only once.
+
+    Presets of the same frame size would encode bit-identical videos, so each
+    size is rendered once and copied to the other outputs. With
+    lazy=True every rendered size decodes its own images while it renders
+    instead, trading repeated decodes for a few resident frames per size.
+    draft=True renders small, fast previews of every preset (see create_video).
+    """
+    from image_utils import print_timing_report
+    
+    plan = compile_plan(image_paths, audio_path, output_path, presets, custom_size, duration_per_image,
+                        transition_duration, transition_style, fps=fps, motion=motion, motion_file=motion_file,
+                        draft=draft)
+    for output in plan.outputs:
+        print(f"🎥 Creating {output.description} video: {output.size[0]}x{output.size[1]} -> {output.path}")
+    print_sources(plan, duration_per_image == 0)
+    
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    
+    if draft:
+        print(f"📝 Draft: {', '.join(f'{w}x{h}' for w, h in (o.frame_size for o in plan.outputs))} "
+              f"@ {plan.fps} fps, x264 {plan.encoder_preset}")
+    
+    # Outputs of the same frame size share one render
+    rendered = unique_outputs(plan.outputs)
+    
+    # Decode each image once and letterbox it for every distinct buffer size
+    spill_dir = tempfile.mkdtemp(prefix='frames_') if spill_to_disk else None
+    frames_by_output = []
+    try:
+        if lazy:
+            print(f"🖼️  Decoding {len(image_paths)} images while rendering {len(rendered)} sizes...")
+            frames_by_output = lazy_sources(plan, cache_dir, rendered)
+        else:
+            print(f"🖼️  Processing {len(plan.sources)} images for {len(rendered)} sizes...")
+            frames_by_output = decode_sources(plan, workers, cache_dir, cache_size_mb, rendered)
+        if spill_dir:
+            frames_by_output = [spill_frames(frames, Path(spill_dir) / str(n))
+                                for n, frames in enumerate(frames_by_output)]
         
-        clips.append(clip)
+        with tempfile.TemporaryDirectory(prefix='audio_') as work_dir:
+            # Prepare the audio once and stream-copy it into every output
+            print("🔊 Preparing audio...")
+            prepared_audio = prepare_audio(audio_path, work_dir, audio_cache_dir)
+            
+            # Lyrics are rasterized once per output size
+            overlays_by_output = [None] * len(rendered)
+            if lyrics_path:
+                from lyrics import lyric_overlays
+                overlays_by_output = [lyric_overlays(lyrics_path, output.frame_size, plan.fps, plan.video_frames,
+                                                     lyrics_font, lyrics_size)
+                                      for output in rendered]
+            
+            # Run one encoder per size at the same time, sharing the thread budget
+            print(f"🚀 Rendering {len(rendered)} videos...")
+            encoder_threads = max(1, threads // len(rendered))
+            with ThreadPoolExecutor(max_workers=len(rendered)) as pool:
+                futures = [
+                    pool.submit(
+                        render_slideshow,
+                        frames,
+                        plan.timeline,
+                        prepared_audio,
+                        str(output.path),
+                        fps=plan.fps,
+                        preset=plan.encoder_preset,
+                        threads=encoder_threads,
+                        audio_codec='copy',
+                        chunks=chunks,
+                        segment_cache_dir=segment_cache_dir,
+                        overlays=overlays,
+                        motions=plan.motions,
+                        frame_size=output.frame_size
+                    )
+                    for frames, output, overlays in zip(frames_by_output, rendered, overlays_by_output)
+                ]
+                for future in futures:
+                    future.result()
+    finally:
+        if lazy:
+            for frames in frames_by_output:
+                frames.close(cache_size_mb)
+                if frames.results:
+                    print_timing_report(*frames.timing_report())
+        frames_by_output = None
+        if spill_dir:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+    
+    # Copy the shared renders to the other presets of the same size
+    for output in plan.outputs:
+        source = next(r for r in rendered if r.frame_size == output.frame_size)
+        if source is not output:
+            # A copy, not a hard link: a later render of one preset must not rewrite the other
+            shutil.copyfile(source.path, output.path)
+            print(f"🔗 {output.description} uses the {output.frame_size[0]}x{output.frame_size[1]} render "
+                  f"of {source.description}")
+    
+    if draft_sheet or draft_gif:
+        from draft import key_frames, write_extras
+        frame_numbers = key_frames(len(image_paths), plan.frames_per_image)
+        for output in plan.outputs:
+            for path in write_extras(output.path, frame_numbers, draft_sheet, draft_gif):
+                print(f"🖼️  Key frames saved to: {path}")
+    
+    for output in plan.outputs:
+        print(f"✅ Video saved to: {output.path}")
+
+def spill_frames(frames, spill_dir):
+    """Move frames to memory-mapped .npy files in spill_dir; repeated images share one file"""
+    from image_utils import spill_frame
+    Path(spill_dir).mkdir(parents=True, exist_ok=True)
+    spilled = {}
+    result = []
+    for frame in frames:
+        if id(frame) not in spilled:
+            spilled[id(frame)] = spill_frame(frame, spill_dir, len(spilled) + 1)
+        result.append(spilled[id(frame)])
+    return result
+
+def print_sources(plan, auto_duration=False):
+    """Report the images and audio a plan renders"""
+    print(f"📸 Found {len(plan.image_sources)} images")
+    if plan.repeated_images:
+        print(f"♻️  {plan.repeated_images} of them repeat an earlier image and are decoded once")
+    print(f"🔊 Using audio: {os.path.basename(plan.audio_path)}")
+    print(f"⏱️  Audio duration: {plan.audio_duration:.1f} seconds")
+    if auto_duration:
+        print(f"⏱️  Auto-calculated {plan.duration_per_image:.1f} seconds per image")
+
+def render_with_moviepy(frames, audio_path, output_path, duration_per_image, transition_duration, threads=4,
+                        writer='moviepy', pipe_format='rgb24', fps=DEFAULT_FPS, preset=DEFAULT_ENCODER_PRESET):
+    """Composite every frame of the timeline with moviepy (audio_path must be AAC).
+
+    writer='pipe' streams the composited frames straight into ffmpeg instead of
+    going through write_videofile. Lazy frames become clips that only read
+    their image while they are on screen.
+    """
+    from moviepy.editor import ImageClip, concatenate_videoclips
+    
+    # Create video clips from frames
+    clips = []
+    with profiler.span('build clips', clips=len(frames)):
+        for i in range(1, len(frames) + 1):
+            if isinstance(frames, list):
+                clip = ImageClip(frames[i - 1]).set_duration(duration_per_image)
+            else:
+                clip = lazy_clip(frames, i - 1, duration_per_image)
+            
+            # Add crossfade transition (except for first clip)
+            if i > 1 and transition_duration > 0:
+                clip = clip.crossfadein(transition_duration)
+            
+            clips.append(clip)
     
     # Concatenate all clips
     print("🎬 Combining images...")
-    video = concatenate_videoclips(clips, method="compose")
-    video = video.set_audio(audio)
+    with profiler.span('concatenate_videoclips'):
+        video = concatenate_videoclips(clips, method="compose")
     
-    # Create output directory if it doesn't exist
-    output_path = Path(output_path)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Export
+    # Export (the prepared AAC audio is muxed with stream copy, no temp audio file)
     print(f"🚀 Exporting video to: {output_path}")
-    video.write_videofile(
-        str(output_path),
-        fps=24,
-        codec='libx264',
-        audio_codec='aac',
-        temp_audiofile='temp-audio.m4a',
-        remove_temp=True,
-        logger='bar',  # Show progress bar
-        threads=4,     # Use multiple threads for faster encoding
-        preset='fast', # Faster encoding with slightly larger file size
-        ffmpeg_params=['-pix_fmt', 'yuv420p']  # Better compatibility
-    )
-    
-    # Clean up
-    for i in range(1, len(image_paths) + 1):
-        temp_img = f'temp_img_{i}.jpg'
-        if os.path.exists(temp_img):
-            os.remove(temp_img)
+    if writer == 'pipe':
+        write_clip(video, str(output_path), fps=fps, audio_path=audio_path, preset=preset, threads=threads,
+                   pix_fmt=pipe_format)
+        return
+    with profiler.span('write_videofile (compose + encode)', 'encoder', frames=round(video.duration * fps)):
+        video.write_videofile(
+            str(output_path),
+            fps=fps,
+            codec='libx264',
+            audio=str(audio_path),
+            logger='bar',  # Show progress bar
+            threads=threads,  # Use multiple threads for faster encoding
+            preset=preset,
+            ffmpeg_params=['-pix_fmt', 'yuv420p', '-t', f'{video.duration:.3f}']  # Better compatibility
+        )
+
+def lazy_clip(frames, index, duration):
+    """A moviepy clip showing frames[index], read from a lazy frame sequence only when drawn"""
+    from moviepy.editor import VideoClip
     
-    print(f"✅ Video saved to: {output_path}")
+    # Set the frame function afterwards: VideoClip(make_frame) would read the frame right away
+    clip = VideoClip(duration=duration)
+    clip.make_frame = lambda t: frames[index]
+    clip.size = frames.output_size
+    return clip
+
+def check_inputs(image_paths, audio_path, output_path, presets, custom_size=None,
+                 duration_per_image=5, transition_duration=0.5, transition_style='crossfade', fps=DEFAULT_FPS,
+                 motion=None, motion_file=None, draft=False):
+    """Validate the inputs and print the planned timeline without rendering anything.
+
+    Only image headers are read and the audio is probed, so this is cheap
+    enough to run before every render. Returns 0 when everything is valid.
+    """
+    from PIL import Image
+    
+    problems = []
+    for path in image_paths:
+        try:
+            with Image.open(path):
+                pass
+        except (OSError, ValueError) as e:
+            problems.append(f"Cannot read image {path}: {e}")
+    try:
+        audio_duration = probe_duration(audio_path)
+    except RuntimeError as e:
+        problems.append(str(e))
+        audio_duration = None
+    
+    plan = None
+    try:
+        plan = compile_plan(image_paths, audio_path, output_path, presets, custom_size, duration_per_image,
+                            transition_duration, transition_style, fps=fps, motion=motion,
+                            motion_file=motion_file, draft=draft, audio_duration=audio_duration or 0)
+    except (OSError, ValueError) as e:
+        problems.append(f"Invalid motion: {e}" if motion or motion_file else str(e))
+    if plan and plan.motions:
+        zooms = sorted({point[0] for key_points in plan.motions for point in key_points})
+        print(f"🎞️  Ken Burns motion on {len(plan.motions)} images (zoom {zooms[0]:g} - {zooms[-1]:g})")
+    
+    for output in plan.outputs if plan else ():
+        width, height = output.frame_size
+        print(f"🎥 {output.description}: {width}x{height} @ {plan.fps} fps -> {output.path}")
+        if width % 2 or height % 2:
+            problems.append(f"{output.description}: width and height must be even for H.264 (got {width}x{height})")
+    
+    if plan and (audio_duration is not None or duration_per_image):
+        print_timeline(plan)
+        audio_text = f"{audio_duration:.1f}s" if audio_duration is not None else 'unknown'
+        print(f"⏱️  Video length: {plan.timeline.total_frames / plan.fps:.1f}s, audio length: {audio_text}")
+    
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        return 1
+    print("✅ Check passed (nothing was rendered)")
+    return 0
 
 def list_presets():
     """List all available video presets"""
@@ -155,7 +391,8 @@ def main():
     
     # Video size options
     parser.add_argument('--preset', default='youtube',
-                      help='Video size preset (youtube, tiktok, instagram_post, etc.)')
+                      help='Video size preset (youtube, tiktok, instagram_post, etc.). '
+                           'A comma-separated list renders every preset in one run, e.g. youtube,tiktok')
     parser.add_argument('--width', type=int, help='Custom width (use with --preset custom)')
     parser.add_argument('--height', type=int, help='Custom height (use with --preset custom)')
     parser.add_argument('--list-presets', action='store_true',
@@ -166,6 +403,78 @@ def main():
                       help='Duration to show each image (seconds). 0 = auto-calculate based on audio length')
     parser.add_argument('--transition', type=float, default=0.5,
                       help='Crossfade transition duration between images (seconds)')
+    parser.add_argument('--transition-style', choices=sorted(TRANSITIONS), default='crossfade',
+                      help='Transition effect between images (default: crossfade)')
+    parser.add_argument('--fps', type=int, default=DEFAULT_FPS,
+                      help=f'Frames per second (default: {DEFAULT_FPS}, drafts use their own)')
+    
+    # Motion options
+    parser.add_argument('--motion', choices=('auto', 'none') + MOTIONS,
+                      help='Ken Burns pan/zoom on every image; auto cycles through the motions (default: off)')
+    parser.add_argument('--motion-file',
+                      help='JSON file with a motion per image file name, e.g. {"default": "zoom_in", '
+                           '"02.jpg": "pan_left", "03.jpg": {"start": [1, 0.5, 0.5], "end": [1.3, 0.2, 0.4]}}')
+    
+    # Lyrics options
+    parser.add_argument('--lyrics',
+                      help='Lyrics to draw over the video: script.text style (spread evenly), .lrc or .srt')
+    parser.add_argument('--lyrics-font', help='TrueType font for the lyrics (default: DejaVu Sans Bold)')
+    parser.add_argument('--lyrics-size', type=int, help='Lyrics font size in pixels (default: 1/16 of the height)')
+    
+    # Rendering options
+    parser.add_argument('--renderer', choices=('segments', 'moviepy'), default='segments',
+                      help='segments = encode static stretches once (fast), moviepy = composite every frame (default: segments)')
+    parser.add_argument('--writer', choices=WRITERS, default='moviepy',
+                      help='How the moviepy renderer hands frames to ffmpeg: moviepy = write_videofile, '
+                           'pipe = stream raw frames from a reused buffer (default: moviepy)')
+    parser.add_argument('--pipe-format', choices=PIPE_FORMATS, default='rgb24',
+                      help='Pixel format sent through the pipe writer; yuv420p halves the bytes '
+                           'but converts in NumPy (default: rgb24)')
+    parser.add_argument('--threads', type=int, default=4,
+                      help='Encoder threads (default: 4)')
+    parser.add_argument('--chunks', type=int, default=1,
+                      help='Split the timeline into this many chunks encoded in parallel processes '
+                           '(0 = one per CPU core, default: 1)')
+    parser.add_argument('--workers', type=int,
+                      help='Number of processes used to resize images (default: number of CPU cores)')
+    parser.add_argument('--spill-to-disk', action='store_true',
+                      help='Keep resized frames in a private temp folder instead of memory (for very large slideshows)')
+    parser.add_argument('--lazy', action='store_true',
+                      help='Decode images just before they are shown, with background prefetch, so memory '
+                           'stays flat however many images there are (for very large slideshows)')
+    
+    # Frame cache options
+    parser.add_argument('--no-cache', action='store_true',
+                      help='Do not read or write the resized frame, encoded segment and encoded audio caches')
+    parser.add_argument('--clear-cache', action='store_true',
+                      help='Delete all cached frames, segments and audio and exit')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                      help=f'Frame cache folder (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE_MB,
+                      help=f'Frame cache size limit in MB (default: {DEFAULT_CACHE_SIZE_MB})')
+    
+    # Watch mode
+    parser.add_argument('--watch', action='store_true',
+                      help='Keep running and re-render whenever files in the data folder change '
+                           '(only changed segments are re-encoded)')
+    parser.add_argument('--watch-interval', type=float, default=1.0,
+                      help='Seconds between checks of the data folder in --watch mode (default: 1)')
+    
+    # Draft previews
+    parser.add_argument('--draft', action='store_true',
+                      help='Render a quick low-resolution, low frame rate preview of the same timeline to '
+                           '<output>_draft.mp4 (the resized images are cached for the final render)')
+    parser.add_argument('--draft-sheet', action='store_true',
+                      help='With --draft, also save a contact sheet PNG of one key frame per image')
+    parser.add_argument('--draft-gif', action='store_true',
+                      help='With --draft, also save an animated GIF strip of the key frames')
+    
+    # Diagnostics
+    parser.add_argument('--check', action='store_true',
+                      help='Validate the inputs and print the planned timeline without rendering')
+    parser.add_argument('--profile', nargs='?', const='profile_trace.json', metavar='TRACE',
+                      help='Time every stage and image, print a summary and write a Chrome/Perfetto '
+                           'trace (default file: profile_trace.json)')
     
     args = parser.parse_args()
     
@@ -173,43 +482,180 @@ def main():
     if args.list_presets:
         return list_presets()
     
-    # Validate preset
-    if args.preset.lower() not in VIDEO_PRESETS and args.preset.lower() != 'custom':
-        print(f"❌ Error: Unknown preset '{args.preset}'. Use --list-presets to see available options.")
+    # Clear the frame cache if requested
+    if args.clear_cache:
+        clear_cache(args.cache_dir)
+        clear_audio_cache()
+        clear_segment_cache()
+        print(f"🧹 Cleared frame cache: {args.cache_dir}")
+        print(f"🧹 Cleared audio cache: {DEFAULT_AUDIO_CACHE_DIR}")
+        print(f"🧹 Cleared segment cache: {DEFAULT_SEGMENT_CACHE_DIR}")
+        return 0
+    
+    # Validate presets
+    presets = [p.strip().lower() for p in args.preset.split(',') if p.strip()]
+    for preset in presets:
+        if preset not in VIDEO_PRESETS and preset != 'custom':
+            print(f"❌ Error: Unknown preset '{preset}'. Use --list-presets to see available options.")
+            return 1
+    if len(presets) > 1 and args.renderer != 'segments':
+        print("❌ Error: Rendering several presets at once requires --renderer segments")
+        return 1
+    if args.transition_style != 'crossfade' and args.renderer != 'segments':
+        print("❌ Error: --transition-style requires --renderer segments")
+        return 1
+    if args.lyrics and args.renderer != 'segments':
+        print("❌ Error: --lyrics requires --renderer segments")
+        return 1
+    if (args.motion or args.motion_file) and args.renderer != 'segments':
+        print("❌ Error: --motion and --motion-file require --renderer segments")
+        return 1
+    if (args.draft_sheet or args.draft_gif) and not args.draft:
+        print("❌ Error: --draft-sheet and --draft-gif require --draft")
+        return 1
+    if args.draft and args.renderer != 'segments':
+        print("❌ Error: --draft requires --renderer segments")
+        return 1
+    if args.lazy and args.spill_to_disk:
+        print("❌ Error: --lazy and --spill-to-disk cannot be used together")
+        return 1
+    if args.fps < 1:
+        print("❌ Error: --fps must be at least 1")
+        return 1
+    if (args.writer != 'moviepy' or args.pipe_format != 'rgb24') and args.renderer != 'moviepy':
+        print("❌ Error: --writer and --pipe-format require --renderer moviepy")
         return 1
     
     # Validate custom size if using custom preset
     custom_size = None
-    if args.preset.lower() == 'custom':
+    if 'custom' in presets:
         if not args.width or not args.height:
             print("❌ Error: --width and --height are required when using --preset custom")
             return 1
         custom_size = (args.width, args.height)
     
-    try:
-        # Find files in data folder
-        image_paths, audio_path = find_files_in_data()
+    if args.profile:
+        profiler.start_profiling()
+    
+    segment_cache_dir = None if args.no_cache else DEFAULT_SEGMENT_CACHE_DIR
+    output_path = args.output
+    if args.draft:
+        from draft import draft_output_path
+        output_path = str(draft_output_path(args.output))
+    
+    def find_inputs():
+        """Find files in the data folder and report them"""
+        with profiler.span('find media'):
+            image_paths, audio_path = find_media()
         
         print(f"📁 Found in 'data' folder:")
         print(f"   - Images: {len(image_paths)} files")
         print(f"   - Audio: {os.path.basename(audio_path)}")
+        return image_paths, audio_path
+    
+    def render():
+        """Render every requested preset from the current contents of the data folder"""
+        image_paths, audio_path = find_inputs()
+        
+        # Render every preset from one decode of the images
+        if len(presets) > 1:
+            create_videos(
+                image_paths,
+                audio_path,
+                output_path,
+                presets,
+                custom_size=custom_size,
+                duration_per_image=args.duration,
+                transition_duration=args.transition,
+                workers=args.workers,
+                cache_dir=None if args.no_cache else args.cache_dir,
+                cache_size_mb=args.cache_size,
+                threads=args.threads,
+                audio_cache_dir=None if args.no_cache else DEFAULT_AUDIO_CACHE_DIR,
+                transition_style=args.transition_style,
+                segment_cache_dir=segment_cache_dir,
+                lyrics_path=args.lyrics,
+                lyrics_font=args.lyrics_font,
+                lyrics_size=args.lyrics_size,
+                lazy=args.lazy,
+                motion=args.motion,
+                motion_file=args.motion_file,
+                draft=args.draft,
+                draft_sheet=args.draft_sheet,
+                draft_gif=args.draft_gif,
+                fps=args.fps,
+                chunks=args.chunks or os.cpu_count() or 1,
+                spill_to_disk=args.spill_to_disk
+            )
+            return
         
         # Create the video
         create_video(
             image_paths,
             audio_path,
-            args.output,
-            preset=args.preset.lower(),
+            output_path,
+            preset=presets[0],
             custom_size=custom_size,
             duration_per_image=args.duration,
-            transition_duration=args.transition
+            transition_duration=args.transition,
+            renderer=args.renderer,
+            spill_to_disk=args.spill_to_disk,
+            workers=args.workers,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            cache_size_mb=args.cache_size,
+            threads=args.threads,
+            audio_cache_dir=None if args.no_cache else DEFAULT_AUDIO_CACHE_DIR,
+            chunks=args.chunks or os.cpu_count() or 1,
+            transition_style=args.transition_style,
+            writer=args.writer,
+            pipe_format=args.pipe_format,
+            segment_cache_dir=segment_cache_dir,
+            lyrics_path=args.lyrics,
+            lyrics_font=args.lyrics_font,
+            lyrics_size=args.lyrics_size,
+            lazy=args.lazy,
+            motion=args.motion,
+            motion_file=args.motion_file,
+            draft=args.draft,
+            draft_sheet=args.draft_sheet,
+            draft_gif=args.draft_gif,
+            fps=args.fps
         )
+    
+    try:
+        if args.watch:
+            outputs = [preset_output_path(output_path, p) for p in presets] if len(presets) > 1 else [output_path]
+            return watch('data', render, args.watch_interval, outputs)
+        
+        if args.check:
+            image_paths, audio_path = find_inputs()
+            return check_inputs(
+                image_paths,
+                audio_path,
+                output_path,
+                presets,
+                custom_size=custom_size,
+                duration_per_image=args.duration,
+                transition_duration=args.transition,
+                transition_style=args.transition_style,
+                fps=args.fps,
+                motion=args.motion,
+                motion_file=args.motion_file,
+                draft=args.draft
+            )
+        
+        render()
         
     except Exception as e:
         print(f"❌ Error: {str(e)}")
         return 1
+    finally:
+        if args.profile:
+            profiler.print_summary()
+            profiler.write_trace(args.profile)
+            print(f"📝 Trace written to: {args.profile}")
     
     return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Image Utilities
+Helpers for loading, letterboxing and keeping frames in memory as NumPy arrays
+"""
+
+import os
+import time
+import multiprocessing
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+import profiler
+from frame_cache import file_hash, cache_key, load_cached_frame, store_frame, touch_entries, DEFAULT_CACHE_SIZE_MB
+
+def open_image(image_path, target_sizes):
+    """Open an image, letting the JPEG decoder skip detail none of the targets need"""
+    img = Image.open(image_path)
+    if img.format == 'JPEG':
+        # Reduced-size decoding (1/2, 1/4, 1/8 scale) for the largest requested target
+        scale = max(min(w / img.size[0], h / img.size[1]) for w, h in target_sizes)
+        if scale < 0.5:
+            img.draft(None, (int(img.size[0] * scale) + 1, int(img.size[1] * scale) + 1))
+    return img
+
+def letterbox(img, target_size, method=Image.Resampling.LANCZOS, background=(0, 0, 0)):
+    """Fit an opened image inside target size, centered on a solid background"""
+    img = ImageOps.contain(img, target_size, method=method)
+    
+    # Create new image with target size and paste the resized image
+    new_img = Image.new('RGB', target_size, tuple(background))
+    new_img.paste(
+        img, 
+        ((target_size[0] - img.size[0]) // 2, (target_size[1] - img.size[1]) // 2)
+    )
+    return new_img
+
+def resize_image(image_path, target_size, method=Image.Resampling.LANCZOS, background=(0, 0, 0)):
+    """Resize image to fit target size while maintaining aspect ratio"""
+    return letterbox(open_image(image_path, [target_size]), target_size, method, background)
+
+def image_to_frame(image):
+    """Convert a PIL image to an RGB uint8 array (H x W x 3)"""
+    return np.asarray(image.convert('RGB'))
+
+def spill_frame(frame, spill_dir, index):
+    """Move a frame to a lossless .npy file and return a memory-mapped view.
+
+    Used when frames do not fit in memory: the OS pages them in on demand
+    instead of keeping every decoded frame resident.
+    """
+    path = Path(spill_dir) / f'frame_{index:05d}.npy'
+    np.save(path, frame)
+    return np.load(path, mmap_mode='r')
+
+def load_frames(image_path, target_sizes, cache_dir=None):
+    """Letterbox one image to every target size, decoding it at most once (pool worker).
+
+    Returns a dict with the frames, perf_counter start/end times, the worker's
+    pid, the cache keys and whether every frame came from the cache.
+    """
+    start = time.perf_counter()
+    frames = [None] * len(target_sizes)
+    keys = [None] * len(target_sizes)
+    if cache_dir:
+        content_hash = file_hash(image_path)
+        for n, size in enumerate(target_sizes):
+            keys[n] = cache_key(content_hash, size, Image.Resampling.LANCZOS, (0, 0, 0))
+            frames[n] = load_cached_frame(cache_dir, keys[n])
+    
+    missing = [n for n, frame in enumerate(frames) if frame is None]
+    if missing:
+        img = open_image(image_path, [target_sizes[n] for n in missing])
+        for n in missing:
+            frames[n] = image_to_frame(letterbox(img, target_sizes[n]))
+            if cache_dir:
+                store_frame(cache_dir, keys[n], frames[n])
+    return {
+        'frames': frames,
+        'start': start,
+        'end': time.perf_counter(),
+        'pid': os.getpid(),
+        'keys': keys,
+        'cached': not missing,
+    }
+
+def preprocess_images_multi(image_paths, target_sizes, workers=None, cache_dir=None,
+                            cache_size_mb=DEFAULT_CACHE_SIZE_MB):
+    """Letterbox all images to several target sizes, in order, using a pool of worker processes.
+
+    Returns one list of frames per target size, the time spent on each image
+    and which images came entirely from the frame cache.
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(image_paths))
+    submitted = time.perf_counter()
+    with profiler.span('preprocess images', images=len(image_paths), workers=workers):
+        if workers <= 1:
+            results = [load_frames(path, target_sizes, cache_dir) for path in image_paths]
+        else:
+            count = len(image_paths)
+            # Spawned, not forked: the caller may run other threads (one holding the import lock)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+                results = list(pool.map(load_frames, image_paths, [target_sizes] * count, [cache_dir] * count))
+    
+    if profiler.enabled():
+        for path, result in zip(image_paths, results):
+            queue_wait = max(0.0, result['start'] - submitted) if workers > 1 else 0.0
+            profiler.add_span(os.path.basename(path), result['start'], result['end'], 'image',
+                              pid=result['pid'], tid=result['pid'], cached=result['cached'],
+                              queue_wait_s=round(queue_wait, 4))
+            profiler.count('image queue wait (s)', queue_wait)
+    
+    if cache_dir:
+        touch_entries(cache_dir, [key for result in results for key in result['keys']], cache_size_mb)
+    
+    frames_by_size = [[result['frames'][n] for result in results] for n in range(len(target_sizes))]
+    timings = [result['end'] - result['start'] for result in results]
+    cache_hits = [result['cached'] for result in results]
+    return frames_by_size, timings, cache_hits
+
+def print_timing_report(image_paths, timings, cache_hits=None):
+    """Print how long each image took to decode and letterbox"""
+    cache_hits = cache_hits or [False] * len(image_paths)
+    print("⏱️  Image preprocessing times:")
+    for path, elapsed, hit in zip(image_paths, timings, cache_hits):
+        note = ' (cached)' if hit else ''
+        print(f"   {os.path.basename(path):30} {elapsed * 1000:8.1f} ms{note}")
+    print(f"   {'total (CPU time)':30} {sum(timings) * 1000:8.1f} ms")
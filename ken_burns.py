@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Ken Burns
+Pan and zoom motion for slideshow images
+
+Each image is letterboxed once into a buffer oversampled by the largest zoom
+used, so the most zoomed-in crop still maps 1:1 onto the output. Every
+output frame is then a sub-pixel crop box of that buffer resampled with
+Pillow's C bilinear filter. The crop boxes of a whole image are computed up
+front with NumPy.
+
+A motion is a pair of (zoom, x, y) key points for the first and last frame
+an image is on screen. zoom 1 shows the whole letterboxed image. x and y
+place the crop inside the room it has to move (0 = left/top edge,
+1 = right/bottom edge).
+"""
+
+import json
+from pathlib import Path
+
+DEFAULT_ZOOM = 1.2
+MOTIONS = ('zoom_in', 'zoom_out', 'pan_left', 'pan_right', 'pan_up', 'pan_down')
+
+def preset_motion(name, zoom=DEFAULT_ZOOM):
+    """Key points for a named motion"""
+    presets = {
+        'zoom_in': ((1.0, 0.5, 0.5), (zoom, 0.5, 0.5)),
+        'zoom_out': ((zoom, 0.5, 0.5), (1.0, 0.5, 0.5)),
+        'pan_left': ((zoom, 1.0, 0.5), (zoom, 0.0, 0.5)),
+        'pan_right': ((zoom, 0.0, 0.5), (zoom, 1.0, 0.5)),
+        'pan_up': ((zoom, 0.5, 1.0), (zoom, 0.5, 0.0)),
+        'pan_down': ((zoom, 0.5, 0.0), (zoom, 0.5, 1.0)),
+    }
+    if name not in presets:
+        raise ValueError(f"Unknown motion '{name}'. Choose from: auto, none, {', '.join(MOTIONS)}")
+    return presets[name]
+
+def parse_motion(spec, index=0, zoom=DEFAULT_ZOOM):
+    """Turn a motion spec into key points.
+
+    spec is a motion name, 'auto' (cycle through the names by image index),
+    'none' (hold the whole image) or a dict {"start": [zoom, x, y], "end": [zoom, x, y]}.
+    """
+    if spec == 'none':
+        return (1.0, 0.5, 0.5), (1.0, 0.5, 0.5)
+    if spec == 'auto':
+        return preset_motion(MOTIONS[index % len(MOTIONS)], zoom)
+    if isinstance(spec, str):
+        return preset_motion(spec, zoom)
+    try:
+        start, end = (tuple(float(value) for value in spec[key]) for key in ('start', 'end'))
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Invalid motion {spec!r}: expected a name or {{'start': [zoom, x, y], 'end': [zoom, x, y]}}")
+    if len(start) != 3 or len(end) != 3 or min(start[0], end[0]) < 1:
+        raise ValueError(f"Invalid motion {spec!r}: key points are [zoom >= 1, x, y]")
+    return start, end
+
+def load_motions(image_paths, default='auto', motion_file=None, zoom=DEFAULT_ZOOM):
+    """Key points for every image: the default motion, overridden per file name by a JSON motion file.
+
+    The motion file maps image file names to motion specs, and may set
+    "default" for images it does not list, e.g.
+    {"default": "zoom_in", "02.jpg": "pan_left", "03.jpg": {"start": [1, 0.5, 0.5], "end": [1.3, 0.2, 0.4]}}
+    """
+    overrides = {}
+    if motion_file:
+        with open(motion_file, encoding='utf-8') as f:
+            overrides = json.load(f)
+        default = overrides.pop('default', default)
+    return [parse_motion(overrides.get(Path(path).name, default), i, zoom) for i, path in enumerate(image_paths)]
+
+def oversampled_size(frame_size, motions):
+    """Buffer size that lets the most zoomed-in crop map 1:1 onto the output (even, for H.264 scalers)"""
+    zoom = max([point[0] for motion in motions for point in motion] + [1.0])
+    return tuple(2 * round(side * zoom / 2) for side in frame_size)
+
+def crop_boxes(motion, span, buffer_size):
+    """(span, 4) array of left, top, right, bottom crop boxes moving linearly between the key points"""
+    import numpy as np
+    (z0, x0, y0), (z1, x1, y1) = motion
+    progress = np.linspace(0.0, 1.0, span) if span > 1 else np.zeros(1)
+    zoom = z0 + (z1 - z0) * progress
+    x = np.clip(x0 + (x1 - x0) * progress, 0, 1)
+    y = np.clip(y0 + (y1 - y0) * progress, 0, 1)
+    width, height = buffer_size[0] / zoom, buffer_size[1] / zoom
+    left = x * (buffer_size[0] - width)
+    top = y * (buffer_size[1] - height)
+    return np.stack([left, top, left + width, top + height], axis=1)
+
+def motion_frames(buffer, motion, span, first, n_frames, frame_size):
+    """Yield frames first .. first + n_frames of an image that is on screen for span frames"""
+    import numpy as np
+    from PIL import Image
+    image = Image.fromarray(np.ascontiguousarray(buffer))
+    boxes = crop_boxes(motion, span, (image.width, image.height))
+    for box in boxes[first:first + n_frames]:
+        yield np.asarray(image.resize(frame_size, Image.Resampling.BILINEAR, box=tuple(box)))
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Lazy Frames
+A slideshow's frames decoded just before they are needed
+
+LazyFrames behaves like a list of frames from preprocess_images_multi, but
+only keeps a small sliding window resident: the frames used most recently
+(the current image and the one a transition fades from) plus the next few
+images, which background threads decode and letterbox ahead of time. Peak
+memory depends on the window, not on the number of images.
+
+Frames still go through the frame cache, so a lazy render after an eager one
+(or the other way round) reuses the same letterboxed frames. With an
+output_size (drafts) the cached full-size frame is scaled down after loading.
+"""
+
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import profiler
+from frame_cache import DEFAULT_CACHE_SIZE_MB
+
+DEFAULT_WINDOW = 2
+DEFAULT_PREFETCH = 2
+
+def _load_frame(image_path, target_size, cache_dir, output_size):
+    """Decode and letterbox one image, then scale it to output_size (prefetch thread)"""
+    from image_utils import load_frames
+    result = load_frames(image_path, [target_size], cache_dir)
+    if output_size != target_size:
+        from draft import scale_frame
+        result['frames'] = [scale_frame(result['frames'][0], output_size)]
+    return result
+
+class LazyFrames:
+    """Read-only sequence of letterboxed frames decoded on first access.
+
+    Indexing is fastest in timeline order. Every access schedules the next
+    prefetch images on a thread pool, and frames that fall out of the window
+    are dropped. Frames are held by image path, so an image that appears
+    several times close together is decoded once. Instances can be pickled
+    into chunk worker processes; each process then keeps its own window and
+    hands its results back to the parent (see merge_results).
+    """
+
+    def __init__(self, image_paths, target_size, cache_dir=None, window=DEFAULT_WINDOW,
+                 prefetch=DEFAULT_PREFETCH, output_size=None):
+        self.image_paths = list(image_paths)
+        self.target_size = tuple(target_size)
+        self.output_size = tuple(output_size or target_size)
+        self.cache_dir = cache_dir
+        self.window = max(2, window)
+        self.prefetch = max(0, prefetch)
+        self._reset()
+
+    def _reset(self):
+        self._resident = OrderedDict()
+        self._pending = {}
+        self._pool = None
+        self.results = {}
+
+    def __getstate__(self):
+        # Resident frames and the thread pool stay in the process that made them
+        return {name: getattr(self, name) for name in
+                ('image_paths', 'target_size', 'output_size', 'cache_dir', 'window', 'prefetch')}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset()
+
+    def __len__(self):
+        return len(self.image_paths)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        path = self.image_paths[index]
+        frame = self._resident.get(path)
+        if frame is None:
+            frame = self._fetch(index)
+        self._resident.move_to_end(path)
+        while len(self._resident) > self.window:
+            self._resident.popitem(last=False)
+        self._schedule(index)
+        return frame
+
+    def _fetch(self, index):
+        """Wait for a prefetched frame or decode it now"""
+        path = self.image_paths[index]
+        future = self._pending.pop(path, None)
+        if future is None:
+            profiler.count('lazy frames decoded on demand', 1)
+            with profiler.span('decode frame', 'image', index=index):
+                result = _load_frame(path, self.target_size, self.cache_dir, self.output_size)
+        else:
+            waited = time.perf_counter()
+            result = future.result()
+            profiler.count('lazy frame wait (s)', time.perf_counter() - waited)
+        self.results[path] = {key: result[key] for key in ('start', 'end', 'keys', 'cached')}
+        self._resident[path] = result['frames'][0]
+        return self._resident[path]
+
+    def _schedule(self, index):
+        """Start decoding the images after index that are not resident or in flight yet"""
+        if not self.prefetch:
+            return
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.prefetch, thread_name_prefix='prefetch')
+        for ahead in range(index + 1, min(len(self), index + 1 + self.prefetch)):
+            path = self.image_paths[ahead]
+            if path not in self._resident and path not in self._pending:
+                self._pending[path] = self._pool.submit(
+                    _load_frame, path, self.target_size, self.cache_dir, self.output_size
+                )
+
+    def stop(self):
+        """Stop prefetching and drop every resident frame, keeping the decode results"""
+        if self._pool is not None:
+            for future in self._pending.values():
+                future.cancel()
+            self._pool.shutdown(wait=True)
+        self._resident.clear()
+        self._pending.clear()
+        self._pool = None
+
+    def merge_results(self, results):
+        """Add the results a copy of this sequence collected in a chunk worker process"""
+        self.results.update(results)
+
+    def close(self, cache_size_mb=DEFAULT_CACHE_SIZE_MB):
+        """Stop prefetching, drop every resident frame and update the frame cache's usage index"""
+        self.stop()
+        if self.cache_dir and self.results:
+            from frame_cache import touch_entries
+            touch_entries(self.cache_dir, [key for result in self.results.values() for key in result['keys']],
+                          cache_size_mb)
+
+    def timing_report(self):
+        """(image paths, timings, cache hits) for the images this process decoded, for print_timing_report"""
+        paths = list(self.results)
+        return (paths,
+                [self.results[path]['end'] - self.results[path]['start'] for path in paths],
+                [self.results[path]['cached'] for path in paths])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Lyrics Overlay
+Timed lyrics drawn once per line with Pillow and alpha-blended with NumPy
+
+Supported lyric files:
+  - script.text style: one lyric per line with [verse] / [final] style
+    section markers. There are no timestamps, so lines are spread evenly over
+    the song and a [break ...] marker leaves one empty slot.
+  - LRC: [mm:ss.xx] timestamps, each line shown until the next one
+  - SRT: numbered cues with 00:00:01,000 --> 00:00:04,000 timings
+
+Each distinct line is rasterized once into a cropped RGBA layer. The segment
+renderer blends a layer once per static stretch and per frame only inside
+transitions, so the cost follows the number of lines, not frames.
+"""
+
+import re
+import math
+import hashlib
+import numpy as np
+from pathlib import Path
+from PIL import Image, ImageDraw, ImageFont
+import profiler
+
+LRC_TIME = re.compile(r'\[(\d+):(\d+(?:\.\d+)?)\]')
+SRT_TIME = re.compile(r'(\d+):(\d+):(\d+)[,.](\d+)\s*-->\s*(\d+):(\d+):(\d+)[,.](\d+)')
+DEFAULT_FONT = 'DejaVuSans-Bold.ttf'
+
+def clean_text(text):
+    """Strip markup and turn tab-separated halves of a line into two rows"""
+    text = re.sub(r'<[^>]+>', '', text)
+    rows = [' '.join(row.split()) for row in re.split(r'\t+| {3,}', text.strip())]
+    return '\n'.join(row for row in rows if row)
+
+def parse_script(text, duration):
+    """script.text style: untimed lines spread evenly over duration"""
+    slots = []
+    for line in text.splitlines():
+        line = line.strip()
+        marker = re.match(r'\[([^\]]*)\]', line)
+        if marker:
+            if marker.group(1).strip().lower().startswith(('break', 'instrumental', 'solo')):
+                slots.append(None)
+            continue
+        if line:
+            slots.append(clean_text(line))
+    if not slots:
+        return []
+    slot = duration / len(slots)
+    return [(k * slot, (k + 1) * slot, text) for k, text in enumerate(slots) if text]
+
+def parse_lrc(text, duration):
+    """LRC: each timestamped line is shown until the next timestamp"""
+    stamps = []
+    for line in text.splitlines():
+        times = LRC_TIME.findall(line)
+        lyric = clean_text(LRC_TIME.sub('', line))
+        for minutes, seconds in times:
+            stamps.append((int(minutes) * 60 + float(seconds), lyric))
+    stamps.sort(key=lambda stamp: stamp[0])
+    ends = [start for start, _ in stamps[1:]] + [duration]
+    return [(start, end, lyric) for (start, lyric), end in zip(stamps, ends) if lyric and end > start]
+
+def parse_srt(text, duration):
+    """SRT: every cue carries its own start and end time"""
+    lines = []
+    for block in re.split(r'\n\s*\n', text.strip()):
+        rows = block.strip().splitlines()
+        for i, row in enumerate(rows):
+            match = SRT_TIME.search(row)
+            if match:
+                h1, m1, s1, ms1, h2, m2, s2, ms2 = (int(value) for value in match.groups())
+                start = h1 * 3600 + m1 * 60 + s1 + ms1 / 1000
+                end = min(duration, h2 * 3600 + m2 * 60 + s2 + ms2 / 1000)
+                lyric = clean_text('\n'.join(rows[i + 1:]).replace('\n', '\t'))
+                if lyric and end > start:
+                    lines.append((start, end, lyric))
+                break
+    return lines
+
+def lyric_overlays(path, frame_size, fps, total_frames, font_path=None, font_size=None):
+    """Load a lyrics file and build its overlays for a video of total_frames frames"""
+    lines = load_lyrics(path, total_frames / fps)
+    overlays = build_overlays(lines, frame_size, fps, total_frames, font_path, font_size)
+    print(f"🎤 Lyrics: {len(overlays)} lines, {len({id(layer) for _, _, layer in overlays})} distinct layers")
+    return overlays
+
+def load_lyrics(path, duration):
+    """Read a lyrics file and return (start_seconds, end_seconds, text) for every line"""
+    text = Path(path).read_text(encoding='utf-8-sig')
+    if Path(path).suffix.lower() == '.srt' or SRT_TIME.search(text):
+        return parse_srt(text, duration)
+    if Path(path).suffix.lower() == '.lrc' or LRC_TIME.search(text):
+        return parse_lrc(text, duration)
+    return parse_script(text, duration)
+
+def load_font(font_path=None, size=48):
+    """Load a TrueType font, falling back to Pillow's built-in font"""
+    try:
+        return ImageFont.truetype(font_path or DEFAULT_FONT, size)
+    except OSError:
+        if font_path:
+            raise
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:  # Pillow < 10.1 has no scalable default font
+        return ImageFont.load_default()
+
+def wrap_text(text, font, max_width):
+    """Break each row of text into lines no wider than max_width"""
+    lines = []
+    for row in text.split('\n'):
+        line = ''
+        for word in row.split():
+            candidate = f'{line} {word}'.strip()
+            if line and font.getlength(candidate) > max_width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return '\n'.join(lines)
+
+def rasterize_line(text, frame_size, font):
+    """Draw one lyric line as a layer cropped to its text, placed near the bottom of the frame.
+
+    The layer holds the colour premultiplied by alpha and 255 - alpha as uint16,
+    ready for blend_layer.
+    """
+    width, height = frame_size
+    font_size = getattr(font, 'size', 10)
+    stroke = max(1, font_size // 12)
+    text = wrap_text(text, font, width * 0.9)
+    probe = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+    box = probe.multiline_textbbox((0, 0), text, font=font, align='center', stroke_width=stroke)
+    left, top, right, bottom = math.floor(box[0]), math.floor(box[1]), math.ceil(box[2]), math.ceil(box[3])
+    layer_width, layer_height = min(width, right - left), min(height, bottom - top)
+    image = Image.new('RGBA', (right - left, bottom - top), (0, 0, 0, 0))
+    ImageDraw.Draw(image).multiline_text((-left, -top), text, font=font, fill=(255, 255, 255, 255),
+                                         align='center', stroke_width=stroke, stroke_fill=(0, 0, 0, 255))
+    rgba = np.asarray(image, dtype=np.uint16)[:layer_height, :layer_width]
+    alpha = rgba[..., 3:]
+    return {
+        'x': (width - layer_width) // 2,
+        'y': max(0, height - layer_height - height // 12),
+        'color': rgba[..., :3] * alpha,
+        'inverse': 255 - alpha,
+        'digest': hashlib.sha256(
+            f"{text}|{getattr(font, 'path', 'default')}|{font_size}|{width}x{height}".encode()
+        ).hexdigest()[:16],
+    }
+
+def blend_layer(frame, layer):
+    """Alpha-blend a rasterized layer into frame in place (only the layer's rectangle is touched)"""
+    height, width = layer['inverse'].shape[:2]
+    region = frame[layer['y']:layer['y'] + height, layer['x']:layer['x'] + width]
+    mixed = np.multiply(region, layer['inverse'], dtype=np.uint16)
+    mixed += layer['color']
+    mixed += 127
+    mixed //= 255
+    np.copyto(region, mixed, casting='unsafe')
+
+def overlay_frames(frames, overlays, layers):
+    """Blend the overlays visible at each frame of an iterable into a reused copy of the frame.
+
+    overlays holds (first, end, layer index) ranges relative to the first frame.
+    """
+    buffer = None
+    for k, frame in enumerate(frames):
+        visible = [index for first, end, index in overlays if first <= k < end]
+        if not visible:
+            yield frame
+            continue
+        if buffer is None:
+            buffer = np.empty_like(frame)
+        np.copyto(buffer, frame)
+        for index in visible:
+            blend_layer(buffer, layers[index])
+        yield buffer
+
+def build_overlays(lines, frame_size, fps, total_frames, font_path=None, font_size=None):
+    """Turn timed lines into (first_frame, end_frame, layer) overlays, rasterizing each distinct line once"""
+    font = load_font(font_path, font_size or max(12, frame_size[1] // 16))
+    layers = {}
+    overlays = []
+    with profiler.span('rasterize lyrics', lines=len(lines)):
+        for start, end, text in lines:
+            first, last = round(start * fps), min(total_frames, round(end * fps))
+            if last <= first:
+                continue
+            if text not in layers:
+                layers[text] = rasterize_line(text, frame_size, font)
+            overlays.append((first, last, layers[text]))
+    return overlays
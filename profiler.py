@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Profiler
+Timing spans for every render stage, saved as a Chrome/Perfetto trace
+
+Profiling is off unless start_profiling() is called. While it is off span()
+returns a shared no-op context manager, so instrumented code pays only for
+one global lookup and one function call.
+
+Times come from time.perf_counter(), which uses a system-wide monotonic clock,
+so spans recorded in worker processes line up with the parent's.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+
+_events = None
+_counters = None
+_origin = 0.0
+_NULL_SPAN = nullcontext()
+
+def start_profiling():
+    """Start recording spans in this process"""
+    global _events, _counters, _origin
+    _events = []
+    _counters = {}
+    _origin = time.perf_counter()
+
+def stop_profiling():
+    """Stop recording and return (events, counters)"""
+    global _events, _counters
+    events, counters = _events or [], _counters or {}
+    _events = None
+    _counters = None
+    return events, counters
+
+def enabled():
+    """True while spans are being recorded"""
+    return _events is not None
+
+def add_span(name, start, end, category='stage', pid=None, tid=None, **args):
+    """Record a span measured elsewhere (perf_counter start and end times)"""
+    if _events is None:
+        return
+    _events.append({
+        'name': name,
+        'cat': category,
+        'ph': 'X',
+        'ts': start * 1e6,
+        'dur': (end - start) * 1e6,
+        'pid': pid or os.getpid(),
+        'tid': tid or threading.get_ident(),
+        'args': args,
+    })
+
+@contextmanager
+def _recording_span(name, category, args):
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        add_span(name, start, time.perf_counter(), category, **args)
+
+def span(name, category='stage', **args):
+    """Context manager timing a block; extra values can be added to the yielded args dict"""
+    if _events is None:
+        return _NULL_SPAN
+    return _recording_span(name, category, args)
+
+def count(name, value):
+    """Add value to a named counter (frames encoded, seconds waited, ...)"""
+    if _counters is not None:
+        _counters[name] = _counters.get(name, 0) + value
+
+def merge(events, counters):
+    """Add events and counters recorded in another process"""
+    if _events is None:
+        return
+    _events.extend(events)
+    for name, value in counters.items():
+        count(name, value)
+
+def write_trace(path):
+    """Write the recorded spans as a Chrome trace (open in chrome://tracing or ui.perfetto.dev)"""
+    events = [dict(event, ts=event['ts'] - _origin * 1e6) for event in _events or []]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+def print_summary():
+    """Print total, mean and max time per span name, plus the counters"""
+    totals = {}
+    for event in _events or []:
+        entry = totals.setdefault((event['cat'], event['name']), [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += event['dur'] / 1000
+        entry[2] = max(entry[2], event['dur'] / 1000)
+
+    print("\n📊 Profile summary:")
+    print(f"   {'stage':40} {'count':>6} {'total ms':>10} {'mean ms':>10} {'max ms':>10}")
+    for (category, name), (n, total, longest) in sorted(totals.items(), key=lambda item: -item[1][1]):
+        label = name if category == 'stage' else f'{category}: {name}'
+        print(f"   {label[:40]:40} {n:6} {total:10.1f} {total / n:10.1f} {longest:10.1f}")
+    for name, value in sorted((_counters or {}).items()):
+        print(f"   {name:40} {value:>10.3f}" if isinstance(value, float) else f"   {name:40} {value:>10}")
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Render Plan
+Compile a render job into an explicit plan shared by every entry point
+
+A plan is everything a render needs to know before a pixel is touched: the
+outputs (preset, frame size, the size images are letterboxed at), the frame
+rate and encoder preset, the distinct source images, the timeline of static
+and transition segments, and the audio. image_audio_to_video.py,
+simple_video_creator.py and run_video_creator.py all resolve their options
+here, so presets, discovery, defaults and draft/motion sizing live in one
+place.
+
+Sources are deduplicated: an image that appears several times on the
+timeline is decoded and letterboxed once, and every position it is shown at
+refers to the same frame. The timeline is stored column-wise in typed
+arrays, one row per segment. Segments only depend on the frames of their own
+images, so they can be executed in any order or in parallel.
+"""
+
+import os
+from array import array
+from pathlib import Path
+from ffmpeg_utils import probe_duration
+from frame_cache import DEFAULT_CACHE_SIZE_MB
+
+# Video presets (width, height, description)
+VIDEO_PRESETS = {
+    'youtube': (1920, 1080, 'YouTube HD (16:9)'),
+    'youtube_short': (1080, 1920, 'YouTube Shorts (9:16)'),
+    'tiktok': (1080, 1920, 'TikTok (9:16)'),
+    'instagram_post': (1080, 1080, 'Instagram Post (1:1)'),
+    'instagram_story': (1080, 1920, 'Instagram Story (9:16)'),
+    'facebook': (1280, 720, 'Facebook (16:9)')
+}
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.m4a')
+DEFAULT_FPS = 24
+DEFAULT_ENCODER_PRESET = 'fast'
+MIN_AUTO_DURATION = 3
+
+# Segment kinds in Timeline.kinds
+STATIC, TRANSITION = 0, 1
+KIND_NAMES = ('static', 'transition')
+
+def get_dimensions(preset, custom_size=None):
+    """Resolve a preset (or custom size) to (width, height, description)"""
+    if preset == 'custom' and custom_size and len(custom_size) == 2:
+        width, height = custom_size
+        return width, height, f'Custom ({width}x{height})'
+    return VIDEO_PRESETS.get(preset, VIDEO_PRESETS['youtube'])
+
+def preset_output_path(output_path, preset):
+    """Output path for one preset of a multi-preset render (video.mp4 -> video_tiktok.mp4)"""
+    output_path = Path(output_path)
+    return output_path.with_name(f'{output_path.stem}_{preset}{output_path.suffix}')
+
+def find_media(data_dir='data', create=True):
+    """Find the images (sorted by name) and the first audio file in a folder.
+
+    Extensions match in any case (camera files are often .JPG). The audio
+    file is the first by name of the first extension in AUDIO_EXTENSIONS
+    that is present. With create=True a missing folder is created before the
+    error is raised.
+    """
+    data_dir = Path(data_dir)
+    if not data_dir.exists():
+        if create:
+            data_dir.mkdir(parents=True, exist_ok=True)
+            raise FileNotFoundError(f"'{data_dir}' folder not found. I've created it for you. "
+                                    f"Please add your files and run again.")
+        raise FileNotFoundError(f"'{data_dir}' folder not found. Please create it and add your files.")
+
+    files = sorted(path for path in data_dir.iterdir() if path.is_file())
+    image_files = [str(path) for path in files if path.suffix.lower() in IMAGE_EXTENSIONS]
+
+    audio_file = None
+    for ext in AUDIO_EXTENSIONS:
+        audio_files = [str(path) for path in files if path.suffix.lower() == ext]
+        if audio_files:
+            audio_file = audio_files[0]  # Use first audio file found
+            break
+
+    if not image_files:
+        raise FileNotFoundError(f"No image files found in the '{data_dir}' folder.")
+    if not audio_file:
+        raise FileNotFoundError(f"No audio file found in the '{data_dir}' folder.")
+    return image_files, audio_file
+
+def dedupe_sources(image_paths):
+    """Return (distinct image paths in first-use order, array mapping every timeline image to its source)"""
+    sources = []
+    index_by_path = {}
+    image_sources = array('l')
+    for path in image_paths:
+        key = os.path.realpath(path)
+        if key not in index_by_path:
+            index_by_path[key] = len(sources)
+            sources.append(str(path))
+        image_sources.append(index_by_path[key])
+    return sources, image_sources
+
+class Timeline:
+    """Slideshow timeline stored column-wise, one row per segment.
+
+    kinds, first, second and frames are typed arrays (second is -1 for a
+    static segment), so a timeline of thousands of images stays a few bytes
+    per segment and pickles cheaply into worker processes. segments()
+    expands the rows into the dicts the segment renderer works on.
+    """
+    __slots__ = ('kinds', 'first', 'second', 'frames', 'style')
+
+    def __init__(self, style='crossfade'):
+        self.kinds = array('b')
+        self.first = array('l')
+        self.second = array('l')
+        self.frames = array('l')
+        self.style = style
+
+    @classmethod
+    def slideshow(cls, n_images, frames_per_image, transition_frames, style='crossfade'):
+        """Each image after the first starts with a transition from the previous one.
+
+        The total length is always n_images * frames_per_image.
+        """
+        timeline = cls(style)
+        transition_frames = max(0, min(transition_frames, frames_per_image - 1))
+        for i in range(n_images):
+            static_frames = frames_per_image
+            if i > 0 and transition_frames:
+                timeline.append(TRANSITION, i - 1, i, transition_frames)
+                static_frames -= transition_frames
+            timeline.append(STATIC, i, -1, static_frames)
+        return timeline
+
+    def append(self, kind, first, second, frames):
+        self.kinds.append(kind)
+        self.first.append(first)
+        self.second.append(second)
+        self.frames.append(frames)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    @property
+    def total_frames(self):
+        return sum(self.frames)
+
+    def count(self, kind):
+        """Number of segments of one kind (STATIC or TRANSITION)"""
+        return self.kinds.count(kind)
+
+    def segment(self, n):
+        """Row n as a segment dict: kind, images, frames and (for transitions) style"""
+        kind = self.kinds[n]
+        if kind == STATIC:
+            return {'kind': KIND_NAMES[kind], 'images': (self.first[n],), 'frames': self.frames[n]}
+        return {'kind': KIND_NAMES[kind], 'images': (self.first[n], self.second[n]), 'frames': self.frames[n],
+                'style': self.style}
+
+    def segments(self):
+        return [self.segment(n) for n in range(len(self))]
+
+class PlannedOutput:
+    """One video of a plan.
+
+    size is the preset size, frame_size the size actually encoded (smaller
+    for drafts), buffer_size the size images are letterboxed at (oversampled
+    for Ken Burns motion) and render_size the buffer scaled like frame_size.
+    """
+    __slots__ = ('path', 'description', 'size', 'frame_size', 'buffer_size', 'render_size')
+
+    def __init__(self, path, description, size, frame_size, buffer_size, render_size):
+        self.path = Path(path)
+        self.description = description
+        self.size = tuple(size)
+        self.frame_size = tuple(frame_size)
+        self.buffer_size = tuple(buffer_size)
+        self.render_size = tuple(render_size)
+
+class RenderPlan:
+    """Everything needed to render a job, resolved before any image is decoded.
+
+    sources holds each distinct image once and image_sources maps every image
+    on the timeline to its source. motions holds Ken Burns key points per
+    timeline image (None without motion).
+    """
+    __slots__ = ('sources', 'image_sources', 'audio_path', 'audio_duration', 'outputs', 'fps', 'encoder_preset',
+                 'duration_per_image', 'transition_duration', 'timeline', 'motions')
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+    @property
+    def image_paths(self):
+        """Image path at every timeline position"""
+        return [self.sources[i] for i in self.image_sources]
+
+    @property
+    def repeated_images(self):
+        """How many timeline images reuse a source shown earlier"""
+        return len(self.image_sources) - len(self.sources)
+
+    @property
+    def frames_per_image(self):
+        return max(1, round(self.duration_per_image * self.fps))
+
+    @property
+    def video_frames(self):
+        """Frames that end up in the video (the timeline, cut at the end of the audio)"""
+        return min(self.timeline.total_frames, round(self.audio_duration * self.fps))
+
+def compile_plan(image_paths, audio_path, output_path, presets=('youtube',), custom_size=None,
+                 duration_per_image=5, transition_duration=0.5, transition_style='crossfade', fps=DEFAULT_FPS,
+                 encoder_preset=DEFAULT_ENCODER_PRESET, motion=None, motion_file=None, draft=False,
+                 audio_duration=None):
+    """Resolve a render job into a RenderPlan.
+
+    duration_per_image=0 spreads the images over the audio (at least
+    MIN_AUTO_DURATION seconds each). With several presets each output path
+    gets its preset name appended. draft=True swaps in the draft frame rate,
+    encoder preset and frame sizes (see draft.py). motion and/or motion_file
+    add Ken Burns key points (see ken_burns.load_motions) and oversample the
+    buffers to match. audio_duration skips probing the audio.
+    """
+    if not image_paths:
+        raise ValueError("No images to render")
+    if audio_duration is None:
+        audio_duration = probe_duration(audio_path)
+    if duration_per_image == 0:
+        duration_per_image = max(MIN_AUTO_DURATION, audio_duration / len(image_paths))
+
+    sources, image_sources = dedupe_sources(image_paths)
+
+    motions = None
+    if motion or motion_file:
+        from ken_burns import load_motions
+        motions = load_motions(image_paths, motion or 'none', motion_file)
+        if all(start[0] == end[0] == 1 for start, end in motions):
+            # Every image holds still at zoom 1: render static segments, not per-frame crops
+            motions = None
+
+    if draft:
+        from draft import DRAFT_FPS, DRAFT_ENCODER_PRESET
+        fps, encoder_preset = DRAFT_FPS, DRAFT_ENCODER_PRESET
+
+    outputs = []
+    for preset in presets:
+        width, height, description = get_dimensions(preset, custom_size)
+        frame_size = buffer_size = (width, height)
+        if draft:
+            from draft import draft_size
+            frame_size = draft_size(width, height)
+        render_size = frame_size
+        if motions:
+            from ken_burns import oversampled_size
+            buffer_size, render_size = oversampled_size(buffer_size, motions), oversampled_size(frame_size, motions)
+        path = preset_output_path(output_path, preset) if len(presets) > 1 else output_path
+        outputs.append(PlannedOutput(path, description, (width, height), frame_size, buffer_size, render_size))
+
+    timeline = Timeline.slideshow(len(image_paths), max(1, round(duration_per_image * fps)),
+                                  round(transition_duration * fps), transition_style)
+    return RenderPlan(sources=sources, image_sources=image_sources, audio_path=str(audio_path),
+                      audio_duration=audio_duration, outputs=outputs, fps=fps, encoder_preset=encoder_preset,
+                      duration_per_image=duration_per_image, transition_duration=transition_duration,
+                      timeline=timeline, motions=motions)
+
+def compile_still(image_path, audio_path, output_path, preset='youtube', custom_size=None, fps=DEFAULT_FPS,
+                  draft=False):
+    """Plan a single image shown for the whole length of the audio"""
+    audio_duration = probe_duration(audio_path)
+    return compile_plan([image_path], audio_path, output_path, [preset], custom_size,
+                        duration_per_image=audio_duration, transition_duration=0, fps=fps, draft=draft,
+                        audio_duration=audio_duration)
+
+def unique_outputs(outputs):
+    """The first output of every frame size (outputs of the same size render bit-identical videos)"""
+    by_size = {}
+    for output in outputs:
+        by_size.setdefault(output.frame_size, output)
+    return list(by_size.values())
+
+def decode_sources(plan, workers=None, cache_dir=None, cache_size_mb=DEFAULT_CACHE_SIZE_MB, outputs=None):
+    """Letterbox every distinct source once per buffer size and lay the frames out in timeline order.
+
+    Returns one list of frames per output (default: every output of the
+    plan). Outputs that share a buffer size share the decode, and an image
+    used several times on the timeline is the same array at every position.
+    """
+    from image_utils import preprocess_images_multi, print_timing_report
+
+    outputs = plan.outputs if outputs is None else outputs
+    sizes = list(dict.fromkeys(output.buffer_size for output in outputs))
+    frames_by_size, timings, cache_hits = preprocess_images_multi(
+        plan.sources, sizes, workers=workers, cache_dir=cache_dir, cache_size_mb=cache_size_mb
+    )
+    print_timing_report(plan.sources, timings, cache_hits)
+
+    frames_by_output = []
+    for output in outputs:
+        frames = frames_by_size[sizes.index(output.buffer_size)]
+        if output.render_size != output.buffer_size:
+            # Drafts: scale the full-size (cached) frames down
+            from draft import scale_frame
+            frames = [scale_frame(frame, output.render_size) for frame in frames]
+        frames_by_output.append([frames[i] for i in plan.image_sources])
+    return frames_by_output
+
+def lazy_sources(plan, cache_dir=None, outputs=None):
+    """One LazyFrames per output (default: every output of the plan), decoding the timeline's images while it renders"""
+    from lazy_frames import LazyFrames
+    outputs = plan.outputs if outputs is None else outputs
+    return [LazyFrames(plan.image_paths, output.buffer_size, cache_dir=cache_dir, output_size=output.render_size)
+            for output in outputs]
+
+def print_timeline(plan):
+    """Print every segment of the plan with its time range and images"""
+    names = [os.path.basename(path) for path in plan.image_paths]
+    timeline = plan.timeline
+    print(f"📋 Planned timeline ({len(timeline)} segments, {timeline.count(STATIC)} static, "
+          f"{timeline.count(TRANSITION)} transitions):")
+    start = 0
+    for segment in timeline.segments():
+        kind = segment.get('style', segment['kind'])
+        label = ' -> '.join(names[i] for i in segment['images'])
+        print(f"   {start / plan.fps:8.2f}s - {(start + segment['frames']) / plan.fps:8.2f}s  {kind:10} {label}")
+        start += segment['frames']
+    if plan.repeated_images:
+        print(f"♻️  {len(plan.sources)} distinct images, {plan.repeated_images} repeats decoded once")
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Render Service
+Local HTTP service that queues render jobs and runs them on warm workers
+
+Jobs use the batch manifest format (see batch_render.py):
+    {"images": ["a.jpg", "b.jpg"], "audio": "song.mp3", "output": "out/a.mp4",
+     "preset": "tiktok", "duration": 4, "transition": 0.5, "priority": 1}
+or {"image": "cover.jpg", ...} for a still-image video. Relative paths are
+resolved against the folder the service was started in.
+
+Endpoints (JSON unless noted):
+    GET    /health            workers, queued and running jobs
+    POST   /jobs              queue a job, returns its id (202)
+    GET    /jobs              every job
+    GET    /jobs/<id>         one job with its progress events
+    GET    /jobs/<id>/events  progress as Server-Sent Events until the job ends
+    DELETE /jobs/<id>         cancel a queued or running job
+
+Each worker is a long-lived process that imports moviepy, NumPy and Pillow
+once at startup and keeps the frame, segment and audio caches warm between
+jobs. The number of workers is the concurrency limit. Higher priority jobs
+start first; equal priorities run in submission order. Cancelling a running
+job kills its worker with the ffmpeg and pool processes it started, deletes
+the partial output, and a fresh worker is started in its place.
+
+Only the standard library is used. The service listens on 127.0.0.1 by
+default, so it can be exercised offline with curl against localhost. There
+is no authentication and jobs can write (and cancelling can delete) any
+output path, so other addresses need --allow-remote.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import signal
+import asyncio
+import argparse
+import ipaddress
+import itertools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from batch_render import resolve_job, plan_concurrency
+
+FINISHED = ('done', 'failed', 'cancelled')
+STATUS_TEXT = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found',
+               405: 'Method Not Allowed', 409: 'Conflict', 500: 'Internal Server Error'}
+
+class _ProgressWriter:
+    """stdout replacement in a worker that sends every printed line to the service"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.buffer = ''
+
+    def write(self, text):
+        self.buffer += text
+        *lines, self.buffer = self.buffer.replace('\r', '\n').split('\n')
+        for line in lines:
+            if line.strip():
+                self.conn.send(('progress', line.strip()))
+        return len(text)
+
+    def flush(self):
+        pass
+
+def worker_main(conn, threads):
+    """Worker process: import everything once, then render jobs sent over conn until None arrives"""
+    if hasattr(os, 'setpgrp'):
+        # Own process group, so a cancel also kills the ffmpeg and pool processes a render starts
+        os.setpgrp()
+    import batch_render
+    import image_audio_to_video  # noqa: F401 (warm imports)
+    import simple_video_creator  # noqa: F401
+    import image_utils  # noqa: F401
+    import moviepy.editor  # noqa: F401
+    conn.send(('ready', os.getpid()))
+    writer = _ProgressWriter(conn)
+    sys.stdout = sys.stderr = writer
+    while True:
+        job = conn.recv()
+        if job is None:
+            return
+        start = time.perf_counter()
+        try:
+            batch_render.render_job(job, threads)
+            conn.send(('done', round(time.perf_counter() - start, 2)))
+        except Exception as e:
+            conn.send(('failed', str(e)))
+
+def kill_worker(process):
+    """Kill a worker together with everything it started (its process group)"""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, OSError):
+        # No process groups (Windows), or the worker has not made its group yet
+        process.kill()
+
+class RenderService:
+    """Job table, priority queue and worker pool behind the HTTP front end"""
+
+    def __init__(self, workers=None, base_dir='.'):
+        cpu_count = os.cpu_count() or 1
+        self.workers, self.threads = plan_concurrency(workers or cpu_count, workers)
+        self.base_dir = base_dir
+        self.jobs = {}
+        self.queue = asyncio.PriorityQueue()
+        self.order = itertools.count()
+        self.processes = {}
+        self.ready = 0
+        # One thread per worker waits on its pipe so the event loop never blocks
+        self.pipe_readers = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='pipe')
+
+    # Jobs
+
+    def submit(self, body):
+        """Validate and queue a job, returning its record"""
+        job = resolve_job(dict(body), self.base_dir)
+        priority = int(job.pop('priority', 0))
+        record = {
+            'id': uuid.uuid4().hex[:12],
+            'status': 'queued',
+            'priority': priority,
+            'job': job,
+            'submitted': time.time(),
+            'events': [],
+            'listeners': [],
+        }
+        self.jobs[record['id']] = record
+        self.queue.put_nowait((-priority, next(self.order), record['id']))
+        self.emit(record, 'queued', f"Queued behind {self.count('queued') - 1} jobs")
+        return record
+
+    def count(self, status):
+        return sum(1 for record in self.jobs.values() if record['status'] == status)
+
+    def emit(self, record, status, message=None, **extra):
+        """Record a progress event and push it to every open event stream of the job"""
+        record['status'] = status
+        event = {'time': round(time.time(), 3), 'status': status, 'message': message, **extra}
+        record['events'].append(event)
+        for listener in record['listeners']:
+            listener.put_nowait(event)
+
+    def cancel(self, record):
+        """Cancel a queued job, or kill the worker running it"""
+        if record['status'] in FINISHED:
+            return False
+        if record['status'] == 'running':
+            process = self.processes.get(record.get('worker'))
+            if process is not None:
+                kill_worker(process)
+        self.emit(record, 'cancelled', 'Cancelled')
+        return True
+
+    def summary(self, record, events=False):
+        result = {key: record[key] for key in ('id', 'status', 'priority', 'job', 'submitted')}
+        for key in ('started', 'finished', 'seconds', 'error'):
+            if key in record:
+                result[key] = record[key]
+        if events:
+            result['events'] = record['events']
+        return result
+
+    # Workers
+
+    def start_worker(self, slot):
+        """Start a worker process and return (process, connection)"""
+        # Spawned, not forked: workers must not inherit the event loop, its threads or the listening socket
+        context = multiprocessing.get_context('spawn')
+        ours, theirs = context.Pipe()
+        process = context.Process(target=worker_main, args=(theirs, self.threads), name=f'render-worker-{slot}')
+        process.start()
+        theirs.close()
+        self.processes[slot] = process
+        return process, ours
+
+    def restart_worker(self, slot, process, conn):
+        """Reap a dead or killed worker and start a fresh one in its slot"""
+        conn.close()
+        kill_worker(process)
+        process.join()
+        self.ready -= 1
+        return self.start_worker(slot)
+
+    async def run_worker(self, slot):
+        """Feed queued jobs to one warm worker process, restarting it after a crash or cancellation"""
+        loop = asyncio.get_running_loop()
+        process, conn = self.start_worker(slot)
+        warm = False
+        while True:
+            if not warm:
+                try:
+                    await loop.run_in_executor(self.pipe_readers, conn.recv)
+                except EOFError:
+                    await asyncio.sleep(1)
+                    process, conn = self.start_worker(slot)
+                    continue
+                warm = True
+                self.ready += 1
+
+            entry = await self.queue.get()
+            record = self.jobs[entry[2]]
+            if record['status'] != 'queued':
+                continue
+
+            try:
+                conn.send(record['job'])
+            except OSError:
+                # The idle worker died: put the job back and replace the worker
+                self.queue.put_nowait(entry)
+                self.emit(record, 'queued', f'Worker {slot} was gone, queued again')
+                process, conn = self.restart_worker(slot, process, conn)
+                warm = False
+                continue
+            record['worker'] = slot
+            record['started'] = time.time()
+            self.emit(record, 'running', f'Started on worker {slot}')
+            while True:
+                try:
+                    kind, value = await loop.run_in_executor(self.pipe_readers, conn.recv)
+                except (EOFError, OSError):
+                    kind, value = 'crashed', None
+                if kind == 'progress':
+                    if record['status'] == 'running':
+                        self.emit(record, 'running', value)
+                    continue
+                break
+
+            record['finished'] = time.time()
+            if record['status'] == 'cancelled':
+                # Drop the half-written video of the killed render
+                output = record['job']['output']
+                if os.path.exists(output) and os.path.getmtime(output) >= record['started']:
+                    os.remove(output)
+            elif kind == 'done':
+                record['seconds'] = value
+                self.emit(record, 'done', f"Saved {record['job']['output']}", seconds=value)
+            elif kind == 'failed':
+                record['error'] = value
+                self.emit(record, 'failed', value)
+            else:
+                record['error'] = 'Worker process exited'
+                self.emit(record, 'failed', record['error'])
+
+            if kind == 'crashed':
+                # Killed by a cancellation (or crashed): replace it with a fresh worker
+                process, conn = self.restart_worker(slot, process, conn)
+                warm = False
+
+    def stop(self):
+        """Kill every worker (their pipe readers then see EOF and return)"""
+        for process in self.processes.values():
+            kill_worker(process)
+            process.join()
+        self.pipe_readers.shutdown(wait=True)
+
+    # HTTP
+
+    async def handle(self, reader, writer):
+        """Serve one HTTP request"""
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            if len(request_line) < 2:
+                return
+            method, path = request_line[0], request_line[1].split('?')[0].rstrip('/')
+            body = await reader.readexactly(int(headers.get('content-length', 0) or 0))
+            await self.route(method, path, body, writer)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body, writer):
+        parts = path.strip('/').split('/')
+        if path == '/health':
+            return respond(writer, 200, {'workers': self.workers, 'ready': self.ready,
+                                         'threads_per_job': self.threads,
+                                         'queued': self.count('queued'), 'running': self.count('running')})
+        if parts[0] != 'jobs':
+            return respond(writer, 404, {'error': f'No route for {path}'})
+        if len(parts) == 1:
+            if method == 'GET':
+                return respond(writer, 200, [self.summary(record) for record in self.jobs.values()])
+            if method != 'POST':
+                return respond(writer, 405, {'error': 'Use GET or POST'})
+            try:
+                record = self.submit(json.loads(body or b'{}'))
+            except (ValueError, TypeError) as e:
+                return respond(writer, 400, {'error': str(e)})
+            return respond(writer, 202, self.summary(record))
+
+        record = self.jobs.get(parts[1])
+        if record is None:
+            return respond(writer, 404, {'error': f'Unknown job {parts[1]}'})
+        if len(parts) == 3 and parts[2] == 'events' and method == 'GET':
+            return await self.stream_events(record, writer)
+        if len(parts) == 2 and method == 'GET':
+            return respond(writer, 200, self.summary(record, events=True))
+        if len(parts) == 2 and method == 'DELETE':
+            if not self.cancel(record):
+                return respond(writer, 409, {'error': f"Job already {record['status']}"})
+            return respond(writer, 200, self.summary(record))
+        return respond(writer, 405, {'error': f'{method} not supported on {path}'})
+
+    async def stream_events(self, record, writer):
+        """Send the job's events so far, then every new one, as Server-Sent Events until it finishes"""
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n'
+                     b'Cache-Control: no-cache\r\nConnection: close\r\n\r\n')
+        listener = asyncio.Queue()
+        for event in record['events']:
+            listener.put_nowait(event)
+        record['listeners'].append(listener)
+        try:
+            while True:
+                event = await listener.get()
+                writer.write(f"event: {event['status']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n".encode())
+                await writer.drain()
+                if event['status'] in FINISHED and listener.empty():
+                    break
+        finally:
+            record['listeners'].remove(listener)
+
+def respond(writer, status, payload):
+    """Write a complete JSON response"""
+    body = json.dumps(payload, indent=2, ensure_ascii=False).encode()
+    writer.write(f'HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: application/json\r\n'
+                 f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode() + body)
+
+async def start_service(host='127.0.0.1', port=8765, workers=None, base_dir='.'):
+    """Start listening and start the workers; returns (service, server, worker tasks).
+
+    port=0 picks a free port (see server.sockets[0].getsockname()).
+    """
+    service = RenderService(workers, base_dir)
+    server = await asyncio.start_server(service.handle, host, port)
+    tasks = [asyncio.create_task(service.run_worker(slot)) for slot in range(service.workers)]
+    return service, server, tasks
+
+async def serve(host='127.0.0.1', port=8765, workers=None):
+    """Run the service until cancelled"""
+    service, server, tasks = await start_service(host, port, workers, os.getcwd())
+    bound = server.sockets[0].getsockname()
+    print(f"🌐 Render service on http://{bound[0]}:{bound[1]} "
+          f"({service.workers} workers, {service.threads} threads each)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        for task in tasks:
+            task.cancel()
+        service.stop()
+
+def is_loopback(host):
+    """Whether host only accepts connections from this machine"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve video renders over a local HTTP API')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--allow-remote', action='store_true',
+                      help='Allow a --host other machines can reach (there is no authentication)')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on, 0 = any free port (default: 8765)')
+    parser.add_argument('--workers', type=int,
+                      help='Warm worker processes, i.e. jobs rendered at once (default: one per 4 CPU cores)')
+    args = parser.parse_args()
+    
+    if not is_loopback(args.host):
+        if not args.allow_remote:
+            print(f"❌ Error: {args.host} is reachable from other machines and the service has no "
+                  f"authentication; jobs can write and delete any output path. Use --allow-remote to do it anyway.")
+            return 1
+        print(f"⚠️  WARNING: listening on {args.host} without authentication. Anyone who can reach it can "
+              f"render to, and delete, any file this user can write.")
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        print("\n👋 Render service stopped")
+    except OSError as e:
+        print(f"❌ Error: {str(e)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Segment Cache
+Content-addressed cache of encoded slideshow segments
+
+A segment is keyed on the pixels of the frames it shows plus every setting
+that changes its encoded bytes. After one image changes, a re-render only
+encodes the segments that show it and reuses every other file.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from pathlib import Path
+from ffmpeg_utils import video_encoder_args
+from frame_cache import DEFAULT_CACHE_DIR, temp_file
+
+DEFAULT_SEGMENT_CACHE_DIR = DEFAULT_CACHE_DIR.parent / 'segments'
+DEFAULT_SEGMENT_CACHE_SIZE_MB = 1024
+
+def frame_digest(frame):
+    """Hash of a frame's pixels and shape"""
+    digest = hashlib.blake2b(str(frame.shape).encode(), digest_size=20)
+    digest.update(frame.data if frame.flags.c_contiguous else frame.tobytes())
+    return digest.hexdigest()
+
+def segment_key(segment, digests, fps, preset='fast', layers=None):
+    """Key a planned segment on its frames, overlays, motion, length, transition and encoder settings"""
+    encoder = ' '.join(str(arg) for arg in video_encoder_args(fps, preset))
+    images = ','.join(digests[i] for i in segment['images'])
+    overlays = ','.join(f"{first}-{end}-{layers[index]['digest']}"
+                        for first, end, index in segment.get('overlays', ()))
+    settings = (f"{segment['kind']}|{segment.get('style', '')}|{segment['frames']}|{overlays}|"
+                f"{segment.get('motion', '')}|{encoder}")
+    return hashlib.sha256(f'{images}|{settings}'.encode()).hexdigest()
+
+def load_segment(cache_dir, key):
+    """Return the cached part files of a segment, or None on a miss"""
+    manifest = Path(cache_dir) / f'{key}.json'
+    try:
+        with open(manifest, encoding='utf-8') as f:
+            names = json.load(f)
+    except (OSError, ValueError):
+        return None
+    parts = [Path(cache_dir) / name for name in names]
+    if not all(part.exists() for part in parts):
+        return None
+    os.utime(manifest)
+    return parts
+
+def store_segment(cache_dir, key, parts):
+    """Copy a freshly encoded segment into the cache and return the cached part files.
+
+    Parts are written first and the manifest last, each with an atomic rename,
+    so readers never see a half-written segment. Temp files get unique names,
+    so threads and processes storing the same segment never collide.
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    stored = {}
+    names = []
+    for part in parts:
+        part = Path(part)
+        if part not in stored:
+            name = f'{key}_{len(stored)}{part.suffix}'
+            temp_path = temp_file(cache_dir)
+            shutil.copyfile(part, temp_path)
+            os.replace(temp_path, cache_dir / name)
+            stored[part] = name
+        names.append(stored[part])
+
+    temp_path = temp_file(cache_dir)
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(names, f)
+    os.replace(temp_path, cache_dir / f'{key}.json')
+    return [cache_dir / name for name in names]
+
+def prune_segments(cache_dir, max_size_mb=DEFAULT_SEGMENT_CACHE_SIZE_MB):
+    """Evict least recently used segments until the cache fits under the size cap"""
+    cache_dir = Path(cache_dir)
+    if not cache_dir.exists():
+        return
+    entries = []
+    for manifest in cache_dir.glob('*.json'):
+        parts = list(cache_dir.glob(f'{manifest.stem}_*'))
+        size = sum(part.stat().st_size for part in parts)
+        entries.append((manifest.stat().st_mtime, size, manifest, parts))
+
+    total = sum(size for _, size, _, _ in entries)
+    for _, size, manifest, parts in sorted(entries, key=lambda entry: entry[0]):
+        if total <= max_size_mb * 1024 * 1024:
+            break
+        total -= size
+        manifest.unlink(missing_ok=True)
+        for part in parts:
+            part.unlink(missing_ok=True)
+
+def clear_segment_cache(cache_dir=DEFAULT_SEGMENT_CACHE_DIR):
+    """Delete every cached segment"""
+    shutil.rmtree(cache_dir, ignore_errors=True)
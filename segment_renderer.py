@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Segment Renderer
+Render a slideshow as static and crossfade segments joined with stream copy
+
+The segments come from a render_plan.Timeline and are encoded independently.
+Overlays (such as lyrics) are (first_frame, end_frame, layer) ranges on the
+timeline. Static segments are cut wherever an overlay starts or ends, so
+each still is blended once; transitions blend only the frames that show an
+overlay.
+
+With Ken Burns motions the frames are oversampled buffers and every segment
+renders each of its frames from them (see ken_burns.py).
+"""
+
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from ffmpeg_utils import encode_still_segment, encode_frames, concat_segments
+from transitions import transition_frames, moving_transition_frames
+from segment_cache import frame_digest, segment_key, load_segment, store_segment, prune_segments
+import profiler
+
+def apply_overlays(segments, spans):
+    """Cut static segments at overlay boundaries and attach the overlays each segment shows.
+
+    spans holds (first_frame, end_frame) per overlay on the whole timeline. Every
+    segment gets an 'overlays' tuple of (first, end, overlay index) relative to
+    its own first frame.
+    """
+    cuts = sorted({frame for span in spans for frame in span})
+    result = []
+    position = 0
+    for segment in segments:
+        start, end = position, position + segment['frames']
+        position = end
+        bounds = [start, end]
+        if segment['kind'] == 'static':
+            bounds = [start] + [cut for cut in cuts if start < cut < end] + [end]
+        for piece_start, piece_end in zip(bounds, bounds[1:]):
+            visible = tuple(
+                (max(first, piece_start) - piece_start, min(last, piece_end) - piece_start, index)
+                for index, (first, last) in enumerate(spans) if first < piece_end and last > piece_start
+            )
+            result.append(dict(segment, frames=piece_end - piece_start, overlays=visible))
+    return result
+
+def apply_motions(segments, motions, frame_size):
+    """Attach to every segment where each of its images is in its motion.
+
+    An image moves from the first frame of the first segment that shows it
+    (its transition in) to the last frame of the last one (its transition
+    out). Each segment gets a 'motion' of (frame_size, ((key points, span,
+    first frame), ...)) with one entry per image.
+    """
+    starts, ends = {}, {}
+    position = 0
+    for segment in segments:
+        for i in segment['images']:
+            starts.setdefault(i, position)
+            ends[i] = position + segment['frames']
+        position += segment['frames']
+    result = []
+    position = 0
+    for segment in segments:
+        images = tuple((motions[i], ends[i] - starts[i], position - starts[i]) for i in segment['images'])
+        result.append(dict(segment, motion=(tuple(frame_size), images)))
+        position += segment['frames']
+    return result
+
+def split_into_chunks(segments, n_images, chunks):
+    """Group numbered segments into runs of whole images for parallel encoding.
+
+    A transition belongs to the image it leads into, so every chunk starts on
+    an image boundary.
+    """
+    chunks = max(1, min(chunks, n_images))
+    bounds = [round(k * n_images / chunks) for k in range(chunks + 1)]
+    groups = [[] for _ in range(chunks)]
+    for number, segment in segments:
+        image = segment['images'][-1]
+        chunk = next(k for k in range(chunks) if bounds[k] <= image < bounds[k + 1])
+        groups[chunk].append((number, segment))
+    return [group for group in groups if group]
+
+def encode_segment(frames, number, segment, fps, work_dir, preset='fast', threads=None, layers=None):
+    """Encode one planned segment and return the files that make it up"""
+    name = f'segment_{number:05d}'
+    overlays = segment.get('overlays')
+    if overlays:
+        from lyrics import blend_layer, overlay_frames
+    if segment.get('motion'):
+        return [encode_motion_segment(frames, name, segment, fps, work_dir, preset, threads, layers)]
+    if segment['kind'] == 'static':
+        frame = frames[segment['images'][0]]
+        if overlays:
+            frame = frame.copy()
+            for _, _, index in overlays:
+                blend_layer(frame, layers[index])
+        return encode_still_segment(frame, segment['frames'], fps, work_dir, name, preset, threads)
+    first, second = segment['images']
+    height, width = frames[second].shape[:2]
+    path = f'{work_dir}/{name}.mp4'
+    blended = transition_frames(segment['style'], frames[first], frames[second], segment['frames'])
+    if overlays:
+        blended = overlay_frames(blended, overlays, layers)
+    encode_frames(blended, width, height, fps, path, preset, threads)
+    return [path]
+
+def encode_motion_segment(frames, name, segment, fps, work_dir, preset='fast', threads=None, layers=None):
+    """Render every frame of a Ken Burns segment from the oversampled buffers and encode it"""
+    from ken_burns import motion_frames
+    frame_size, images = segment['motion']
+    moving = [motion_frames(frames[i], motion, span, first, segment['frames'], frame_size)
+              for i, (motion, span, first) in zip(segment['images'], images)]
+    if segment['kind'] == 'static':
+        rendered = moving[0]
+    else:
+        rendered = moving_transition_frames(segment['style'], moving[0], moving[1], segment['frames'])
+    if segment.get('overlays'):
+        from lyrics import overlay_frames
+        rendered = overlay_frames(rendered, segment['overlays'], layers)
+    path = f'{work_dir}/{name}.mp4'
+    encode_frames(rendered, frame_size[0], frame_size[1], fps, path, preset, threads)
+    return path
+
+def encode_segments(frames, segments, fps, work_dir, preset='fast', threads=None, cache_dir=None, digests=None,
+                    layers=None):
+    """Encode a run of numbered segments and return (files in order, segments reused) (chunk worker).
+
+    frames maps image index to RGB frame and only needs the images the run uses.
+    With cache_dir, segments whose frames and settings were encoded before are
+    taken from the segment cache (digests maps image index to frame_digest and
+    is filled in as images come up). layers holds the overlay layers that
+    segment overlays refer to.
+    """
+    parts = []
+    reused = 0
+    digests = {} if digests is None else digests
+    for number, segment in segments:
+        with profiler.span(f"{segment['kind']} segment", 'segment', number=number, frames=segment['frames']):
+            key = None
+            if cache_dir:
+                for i in segment['images']:
+                    if i not in digests:
+                        digests[i] = frame_digest(frames[i])
+                key = segment_key(segment, digests, fps, preset, layers)
+            cached = load_segment(cache_dir, key) if key else None
+            if cached:
+                profiler.count('segments reused', 1)
+                parts += cached
+                reused += 1
+                continue
+            segment_parts = encode_segment(frames, number, segment, fps, work_dir, preset, threads, layers)
+            parts += store_segment(cache_dir, key, segment_parts) if key else segment_parts
+    return parts, reused
+
+def _encode_chunk(frames, segments, fps, work_dir, preset, threads, cache_dir, layers, profile):
+    """Process pool entry point: encode one chunk and hand back its lazy decode results and profile events.
+
+    Lazy frames are only stopped here; the parent merges the results and
+    updates the frame cache index once, with its own cache size.
+    """
+    if profile:
+        profiler.start_profiling()
+    try:
+        parts, reused = encode_segments(frames, segments, fps, work_dir, preset, threads, cache_dir, None, layers)
+    finally:
+        if hasattr(frames, 'stop'):
+            frames.stop()
+    return parts, reused, getattr(frames, 'results', None), profiler.stop_profiling()
+
+def render_slideshow(frames, timeline, audio_path, output_path, fps=24, preset='fast', threads=None,
+                     audio_codec='aac', chunks=1, segment_cache_dir=None, overlays=None, motions=None,
+                     frame_size=None):
+    """Render a sequence of equally sized RGB frames along a timeline into a slideshow video.
+
+    timeline is a render_plan.Timeline over the indices of frames (see
+    render_plan.compile_plan); it alone decides the segments and their
+    lengths, at fps frames per second. With chunks > 1 the timeline is cut at
+    image boundaries and each chunk is encoded in its own process; the pieces
+    are joined losslessly and the audio is muxed once at the end. With
+    segment_cache_dir only segments that are not already cached get encoded.
+    overlays is a list of (first_frame, end_frame, layer) drawn over the video
+    (see lyrics.build_overlays). frames can also be a lazy_frames.LazyFrames:
+    images are then only read in timeline order and each chunk process
+    decodes its own images. motions holds Ken Burns key points per image (see
+    ken_burns.load_motions); frames are then buffers oversampled for the
+    motion and frame_size is the (width, height) of the video.
+
+    Returns (segments reused from the cache, total segments).
+    """
+    segments = timeline.segments()
+    total_frames = timeline.total_frames
+    layers = None
+    if overlays:
+        layers = [layer for _, _, layer in overlays]
+        segments = apply_overlays(segments, [(first, end) for first, end, _ in overlays])
+    if motions:
+        segments = apply_motions(segments, motions, frame_size)
+    groups = split_into_chunks(list(enumerate(segments)), len(frames), chunks)
+
+    with profiler.span('render slideshow', chunks=len(groups)), \
+            tempfile.TemporaryDirectory(prefix='slideshow_') as work_dir:
+        if len(groups) == 1:
+            parts, reused = encode_segments(frames, groups[0], fps, work_dir, preset, threads,
+                                            segment_cache_dir, None, layers)
+        else:
+            chunk_threads = max(1, (threads or len(groups)) // len(groups))
+            # Spawned, not forked: several outputs render from threads of one process
+            with ProcessPoolExecutor(max_workers=len(groups), mp_context=multiprocessing.get_context('spawn')) as pool:
+                futures = []
+                for group in groups:
+                    # Lists are sliced per chunk; lazy frames are read by the worker itself
+                    chunk_frames = frames
+                    if isinstance(frames, list):
+                        needed = {i for _, segment in group for i in segment['images']}
+                        chunk_frames = {i: frames[i] for i in needed}
+                    futures.append(pool.submit(_encode_chunk, chunk_frames, group, fps, work_dir, preset,
+                                               chunk_threads, segment_cache_dir, layers, profiler.enabled()))
+                parts = []
+                reused = 0
+                for future in futures:
+                    chunk_parts, chunk_reused, results, (events, counters) = future.result()
+                    profiler.merge(events, counters)
+                    if results:
+                        frames.merge_results(results)
+                    parts += chunk_parts
+                    reused += chunk_reused
+
+        concat_segments(parts, output_path, work_dir, audio_path=audio_path,
+                        duration=total_frames / fps, audio_codec=audio_codec)
+    if segment_cache_dir:
+        prune_segments(segment_cache_dir)
+    return reused, len(segments)
@@ -2,82 +2,187 @@
 """
 Simple Video Creator
 Create videos from images and audio files with different size presets
+
+moviepy, NumPy and Pillow are imported only when they are needed, so
+--list-presets, --check and argument errors return quickly.
 """
 
 import os
+import sys
+import tempfile
 from pathlib import Path
-from moviepy.editor import ImageClip, AudioFileClip
-from PIL import Image, ImageOps
 import argparse
+from ffmpeg_utils import STILL_UNIT_SECONDS, encode_still_segment, concat_segments
+from audio_utils import DEFAULT_AUDIO_CACHE_DIR, prepare_audio
+from segment_renderer import render_slideshow
+from render_plan import VIDEO_PRESETS, DEFAULT_FPS, Timeline, compile_still
+from frame_writer import WRITERS, PIPE_FORMATS, write_clip
+import profiler
+
+def create_still_video(image, audio_path, output_path, duration, work_dir, fps=DEFAULT_FPS, threads=None, overlays=None,
+                       preset='fast'):
+    """Encode a single image once and mux the (AAC) audio with stream copy.
 
-# Video presets (width, height, description)
-VIDEO_PRESETS = {
-    'youtube': (1920, 1080, 'YouTube HD (16:9)'),
-    'youtube_short': (1080, 1920, 'YouTube Shorts (9:16)'),
-    'tiktok': (1080, 1920, 'TikTok (9:16)'),
-    'instagram_post': (1080, 1080, 'Instagram Post (1:1)'),
-    'instagram_story': (1080, 1920, 'Instagram Story (9:16)'),
-    'facebook': (1280, 720, 'Facebook (16:9)')
-}
+    With overlays (lyrics) the image is encoded once per stretch between
+    overlay changes instead of once overall.
+    """
+    from image_utils import image_to_frame
+    
+    frame = image_to_frame(image)
+    n_frames = max(1, round(duration * fps))
+    
+    if overlays:
+        print(f"🚀 Encoding still image with lyrics...")
+        render_slideshow([frame], Timeline.slideshow(1, n_frames, 0), audio_path, output_path, fps=fps,
+                         preset=preset, threads=threads, audio_codec='copy', overlays=overlays)
+        return
+    
+    print(f"🚀 Encoding still image...")
+    segments = encode_still_segment(frame, n_frames, fps, work_dir, 'still', preset, threads)
+    
+    print(f"🚀 Muxing audio...")
+    concat_segments(segments, output_path, work_dir, audio_path=audio_path, duration=duration, audio_codec='copy')
 
-def resize_image(image_path, target_size):
-    """Resize image to fit target size while maintaining aspect ratio"""
-    img = Image.open(image_path)
-    img = ImageOps.contain(img, target_size, method=Image.Resampling.LANCZOS)
-    
-    # Create new image with target size and paste the resized image
-    new_img = Image.new('RGB', target_size, (0, 0, 0))  # Black background
-    new_img.paste(
-        img, 
-        ((target_size[0] - img.size[0]) // 2, (target_size[1] - img.size[1]) // 2)
-    )
-    return new_img
+def create_video(image_path, audio_path, output_path, preset='youtube', custom_size=None, renderer='still',
+                 threads=None, audio_cache_dir=DEFAULT_AUDIO_CACHE_DIR, writer='moviepy', pipe_format='rgb24',
+                 lyrics_path=None, lyrics_font=None, lyrics_size=None, visualizer=None, draft=False,
+                 draft_sheet=False, draft_gif=False, fps=DEFAULT_FPS):
+    """Create a video from image and audio.
 
-def create_video(image_path, audio_path, output_path, preset='youtube', custom_size=None):
-    """Create a video from image and audio"""
-    # Get dimensions
-    if preset == 'custom' and custom_size and len(custom_size) == 2:
-        width, height = custom_size
-        preset_name = f'Custom ({width}x{height})'
-    else:
-        width, height, preset_name = VIDEO_PRESETS.get(preset, VIDEO_PRESETS['youtube'])
-    
-    print(f"🎥 Creating {preset_name} video: {width}x{height}")
-    
-    # Load and resize image
+    draft=True renders a small, low frame rate preview with the fastest encoder
+    settings, optionally with a contact sheet and/or GIF of evenly spaced frames.
+    """
+    from image_utils import resize_image
+    
+    # Resolve size, frame rate, encoder preset and length up front
+    plan = compile_still(image_path, audio_path, output_path, preset, custom_size, fps, draft)
+    output = plan.outputs[0]
+    width, height = output.frame_size
+    fps, encoder_preset, duration = plan.fps, plan.encoder_preset, plan.audio_duration
+    
+    print(f"🎥 Creating {output.description} video: {output.size[0]}x{output.size[1]}")
+    if draft:
+        print(f"📝 Draft: {width}x{height} @ {fps} fps, x264 {encoder_preset}")
+    
+    # Load and resize image (drafts letterbox straight to the small size)
     print(f"🖼️  Processing image...")
-    resized_img = resize_image(image_path, (width, height))
-    
-    # Save resized image to temporary file
-    temp_img_path = 'temp_resized_image.jpg'
-    resized_img.save(temp_img_path, 'JPEG')
-    
-    # Load audio
-    print(f"🔊 Loading audio...")
-    audio = AudioFileClip(audio_path)
-    
-    # Create video from image
-    video = ImageClip(temp_img_path, duration=audio.duration)
-    video = video.set_audio(audio)
-    
-    # Export
-    print(f"🚀 Exporting video...")
-    video.write_videofile(
-        output_path,
-        fps=24,
-        codec='libx264',
-        audio_codec='aac',
-        temp_audiofile='temp-audio.m4a',
-        remove_temp=True,
-        logger='bar'  # Show progress bar
-    )
-    
-    # Clean up
-    if os.path.exists(temp_img_path):
-        os.remove(temp_img_path)
+    with profiler.span('resize image'):
+        resized_img = resize_image(image_path, (width, height))
+    
+    with tempfile.TemporaryDirectory(prefix='still_video_') as work_dir:
+        # Stream-copy AAC input, otherwise reuse (or create) a cached AAC encode
+        print(f"🔊 Preparing audio...")
+        prepared_audio = prepare_audio(audio_path, work_dir, audio_cache_dir)
+        
+        overlays = None
+        if lyrics_path:
+            from lyrics import lyric_overlays
+            overlays = lyric_overlays(lyrics_path, (width, height), fps, plan.frames_per_image,
+                                      lyrics_font, lyrics_size)
+        
+        # Animated spectrum or waveform strip over the still image
+        if visualizer:
+            from visualizer import render_visualizer_video
+            from image_utils import image_to_frame
+            print(f"🚀 Rendering {visualizer} visualizer...")
+            with profiler.span('render visualizer', style=visualizer):
+                render_visualizer_video(image_to_frame(resized_img), prepared_audio, output_path, duration, fps=fps,
+                                        style=visualizer, threads=threads, overlays=overlays, preset=encoder_preset)
+        
+        # Fast path: the frame never changes, so encode it once
+        elif renderer == 'still':
+            create_still_video(resized_img, prepared_audio, output_path, duration, work_dir, fps=fps,
+                               threads=threads, overlays=overlays, preset=encoder_preset)
+        
+        if visualizer or renderer == 'still':
+            if draft_sheet or draft_gif:
+                from draft import spaced_frames, write_extras
+                frame_numbers = spaced_frames(plan.frames_per_image)
+                for path in write_extras(output_path, frame_numbers, draft_sheet, draft_gif):
+                    print(f"🖼️  Key frames saved to: {path}")
+            print(f"✅ Video saved to: {output_path}")
+            return
+        
+        # Create video from image
+        from moviepy.editor import ImageClip
+        from image_utils import image_to_frame
+        video = ImageClip(image_to_frame(resized_img), duration=duration)
+        
+        # Export (the prepared AAC audio is muxed with stream copy, no temp audio file)
+        print(f"🚀 Exporting video...")
+        if writer == 'pipe':
+            write_clip(video, output_path, fps=fps, audio_path=prepared_audio, preset=encoder_preset, threads=threads,
+                       pix_fmt=pipe_format)
+            print(f"✅ Video saved to: {output_path}")
+            return
+        with profiler.span('write_videofile', 'encoder', frames=plan.frames_per_image):
+            video.write_videofile(
+                output_path,
+                fps=fps,
+                codec='libx264',
+                audio=prepared_audio,
+                logger='bar',  # Show progress bar
+                threads=threads,
+                ffmpeg_params=['-t', f'{duration:.3f}']
+            )
     
     print(f"✅ Video saved to: {output_path}")
 
+def check_inputs(image_path, audio_path, output_path, preset='youtube', custom_size=None, renderer='still',
+                 fps=DEFAULT_FPS, draft=False, visualizer=None, lyrics_path=None):
+    """Validate the inputs and print what would be rendered, without rendering (--check)"""
+    from PIL import Image
+    
+    problems = []
+    try:
+        with Image.open(image_path) as img:
+            print(f"🖼️  Image: {os.path.basename(image_path)} ({img.size[0]}x{img.size[1]} {img.format})")
+    except (OSError, ValueError) as e:
+        problems.append(f"Cannot read image {image_path}: {e}")
+    try:
+        plan = compile_still(image_path, audio_path, output_path, preset, custom_size, fps, draft)
+    except (OSError, RuntimeError) as e:
+        problems.append(str(e))
+        plan = None
+    
+    if plan:
+        output = plan.outputs[0]
+        width, height = output.frame_size
+        n_frames = plan.frames_per_image
+        print(f"🎥 {output.description}: {width}x{height} @ {plan.fps} fps -> {output.path}")
+        if width % 2 or height % 2:
+            problems.append(f"Width and height must be even for H.264 (got {width}x{height})")
+        print(f"⏱️  Audio: {os.path.basename(audio_path)} ({plan.audio_duration:.1f}s, {n_frames} frames)")
+        
+        lines = None
+        if lyrics_path:
+            from lyrics import load_lyrics
+            try:
+                lines = load_lyrics(lyrics_path, plan.audio_duration)
+                print(f"🎤 Lyrics: {len(lines)} timed lines")
+            except (OSError, UnicodeDecodeError) as e:
+                problems.append(f"Cannot read lyrics {lyrics_path}: {e}")
+        
+        if visualizer:
+            print(f"📋 Plan: render all {n_frames} frames with the {visualizer} visualizer"
+                  + (" and lyrics" if lyrics_path else ''))
+        elif renderer == 'still' and lyrics_path:
+            print(f"📋 Plan: encode the image once per lyric change ({len(lines or ())} lines)")
+        elif renderer == 'still':
+            unit_frames = int(plan.fps * STILL_UNIT_SECONDS)
+            repeats, remainder = divmod(n_frames, unit_frames)
+            print(f"📋 Plan: encode one {STILL_UNIT_SECONDS}s unit, repeat it {repeats} times"
+                  + (f" plus a {remainder}-frame remainder" if remainder else ''))
+        else:
+            print(f"📋 Plan: render all {n_frames} frames with moviepy")
+    
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        return 1
+    print("✅ Check passed (nothing was rendered)")
+    return 0
+
 def list_presets():
     """List all available video presets"""
     print("\nAvailable video presets:")
@@ -101,6 +206,34 @@ def main():
     parser.add_argument('--height', type=int, help='Custom height (use with --preset custom)')
     parser.add_argument('--list-presets', action='store_true',
                       help='List all available video size presets and exit')
+    parser.add_argument('--lyrics',
+                      help='Lyrics to draw over the video: script.text style (spread evenly), .lrc or .srt')
+    parser.add_argument('--lyrics-font', help='TrueType font for the lyrics (default: DejaVu Sans Bold)')
+    parser.add_argument('--lyrics-size', type=int, help='Lyrics font size in pixels (default: 1/16 of the height)')
+    parser.add_argument('--visualizer', choices=('bars', 'wave'),
+                      help='Animate the video with spectrum bars or a waveform computed from the audio')
+    parser.add_argument('--renderer', choices=('still', 'moviepy'), default='still',
+                      help='still = encode the image once (fast), moviepy = render every frame (default: still)')
+    parser.add_argument('--writer', choices=WRITERS, default='moviepy',
+                      help='How the moviepy renderer hands frames to ffmpeg: moviepy = write_videofile, '
+                           'pipe = stream raw frames without copies (default: moviepy)')
+    parser.add_argument('--pipe-format', choices=PIPE_FORMATS, default='rgb24',
+                      help='Pixel format sent through the pipe writer (default: rgb24)')
+    parser.add_argument('--fps', type=int, default=DEFAULT_FPS,
+                      help=f'Frames per second (default: {DEFAULT_FPS}, drafts use their own)')
+    parser.add_argument('--threads', type=int, help='Encoder threads (default: let ffmpeg decide)')
+    parser.add_argument('--draft', action='store_true',
+                      help='Render a quick low-resolution, low frame rate preview to <output>_draft.mp4')
+    parser.add_argument('--draft-sheet', action='store_true',
+                      help='With --draft, also save a contact sheet PNG of evenly spaced frames')
+    parser.add_argument('--draft-gif', action='store_true',
+                      help='With --draft, also save an animated GIF strip of evenly spaced frames')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the encoded audio cache')
+    parser.add_argument('--check', action='store_true',
+                      help='Validate the inputs and print the plan without rendering')
+    parser.add_argument('--profile', nargs='?', const='profile_trace.json', metavar='TRACE',
+                      help='Time every stage, print a summary and write a Chrome/Perfetto trace '
+                           '(default file: profile_trace.json)')
     
     args = parser.parse_args()
     
@@ -112,6 +245,15 @@ def main():
     if args.preset.lower() not in VIDEO_PRESETS and args.preset.lower() != 'custom':
         print(f"❌ Error: Unknown preset '{args.preset}'. Use --list-presets to see available options.")
         return 1
+    if (args.lyrics or args.visualizer or args.draft) and args.renderer != 'still':
+        print("❌ Error: --lyrics, --visualizer and --draft require --renderer still")
+        return 1
+    if (args.draft_sheet or args.draft_gif) and not args.draft:
+        print("❌ Error: --draft-sheet and --draft-gif require --draft")
+        return 1
+    if args.fps < 1:
+        print("❌ Error: --fps must be at least 1")
+        return 1
     
     # Validate custom size if using custom preset
     custom_size = None
@@ -121,25 +263,55 @@ def main():
             return 1
         custom_size = (args.width, args.height)
     
+    output_path = args.output
+    if args.draft:
+        from draft import draft_output_path
+        output_path = str(draft_output_path(args.output))
+    
+    if args.check:
+        return check_inputs(args.image, args.audio, output_path, args.preset.lower(), custom_size, args.renderer,
+                            args.fps, args.draft, args.visualizer, args.lyrics)
+    
     # Create output directory if it doesn't exist
-    output_dir = os.path.dirname(args.output)
+    output_dir = os.path.dirname(output_path)
     if output_dir and not os.path.exists(output_dir):
         os.makedirs(output_dir)
     
+    if args.profile:
+        profiler.start_profiling()
+    
     # Create the video
     try:
         create_video(
             args.image,
             args.audio,
-            args.output,
+            output_path,
             preset=args.preset.lower(),
-            custom_size=custom_size
+            custom_size=custom_size,
+            renderer=args.renderer,
+            threads=args.threads,
+            writer=args.writer,
+            pipe_format=args.pipe_format,
+            lyrics_path=args.lyrics,
+            lyrics_font=args.lyrics_font,
+            lyrics_size=args.lyrics_size,
+            visualizer=args.visualizer,
+            draft=args.draft,
+            draft_sheet=args.draft_sheet,
+            draft_gif=args.draft_gif,
+            fps=args.fps,
+            audio_cache_dir=None if args.no_cache else DEFAULT_AUDIO_CACHE_DIR
         )
     except Exception as e:
         print(f"❌ Error: {str(e)}")
         return 1
+    finally:
+        if args.profile:
+            profiler.print_summary()
+            profiler.write_trace(args.profile)
+            print(f"📝 Trace written to: {args.profile}")
     
     return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import threading
+import numpy as np
+import pytest
+from frame_cache import store_frame, load_cached_frame
+from segment_cache import store_segment, load_segment
+
+FRAME = np.full((720, 1280, 3), 7, dtype=np.uint8)
+SEGMENT = b'encoded segment' * 200000
+
+def frame_cache(tmp_path):
+    """Prefetch threads of two lazy sources (or a repeated image) write the same key at once"""
+    def store(n):
+        store_frame(tmp_path, 'samekey', FRAME)
+
+    def check():
+        assert np.array_equal(load_cached_frame(tmp_path, 'samekey'), FRAME)
+    return tmp_path, store, check
+
+def segment_cache(tmp_path):
+    """Threads rendering same-size presets store identical segment keys at the same moment"""
+    cache_dir = tmp_path / 'segments'
+    parts = []
+    for n in range(2):
+        part = tmp_path / f'part_{n}.mp4'
+        part.write_bytes(SEGMENT)
+        parts.append(part)
+
+    def store(n):
+        store_segment(cache_dir, 'samekey', [parts[n], parts[n]])
+
+    def check():
+        assert [part.read_bytes() for part in load_segment(cache_dir, 'samekey')] == [SEGMENT] * 2
+    return cache_dir, store, check
+
+@pytest.mark.parametrize('cache', [frame_cache, segment_cache])
+def test_store_same_key_from_two_threads(tmp_path, cache):
+    cache_dir, store, check = cache(tmp_path)
+    for _ in range(25):
+        barrier = threading.Barrier(2)
+        errors = []
+
+        def run(n):
+            try:
+                barrier.wait()
+                store(n)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(n,)) for n in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+
+    check()
+    assert not list(cache_dir.glob('*.tmp'))
@@ -0,0 +1,26 @@
+import gc
+import time
+import numpy as np
+import pytest
+from ffmpeg_utils import encode_frames
+
+def test_failing_frames_leave_no_output(tmp_path):
+    """A frame generator that raises must not leave a truncated video behind"""
+    output = tmp_path / 'out.mp4'
+
+    def frames():
+        for _ in range(5):
+            yield np.zeros((64, 64, 3), dtype=np.uint8)
+        raise ValueError('cannot decode image')
+
+    with pytest.raises(ValueError):
+        encode_frames(frames(), 64, 64, 24, output)
+    # An orphaned encoder would finish the file once its stdin is collected
+    gc.collect()
+    time.sleep(0.5)
+    assert not output.exists()
+
+def test_encode_frames(tmp_path):
+    output = tmp_path / 'out.mp4'
+    encode_frames((np.zeros((64, 64, 3), dtype=np.uint8) for _ in range(5)), 64, 64, 24, output)
+    assert output.stat().st_size > 0
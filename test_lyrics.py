@@ -0,0 +1,38 @@
+import pytest
+from lyrics import parse_script, parse_lrc, parse_srt, build_overlays
+
+def test_script_spreads_lines_and_keeps_a_break_slot():
+    text = "[verse 1]\nfirst line\nsecond\tline\n\n[break solo] piano\n[final]\nlast line\n"
+    assert parse_script(text, 40) == [
+        (0, 10, 'first line'),
+        (10, 20, 'second\nline'),
+        (30, 40, 'last line'),
+    ]
+
+def test_script_without_lyrics():
+    assert parse_script('[verse 1]\n\n[break]\n', 30) == []
+
+def test_lrc_lines_last_until_the_next_timestamp():
+    text = "[ar:someone]\n[00:01.50]one\n[00:04.00]\n[00:05.00][01:00.00]two\n[00:03.00]three\n"
+    assert parse_lrc(text, 70) == [
+        (1.5, 3.0, 'one'),
+        (3.0, 4.0, 'three'),
+        (5.0, 60.0, 'two'),
+        (60.0, 70, 'two'),
+    ]
+
+def test_srt_cues_are_clamped_to_the_song():
+    text = ("1\n00:00:01,000 --> 00:00:04,500\nhello\nworld\n\n"
+            "2\n00:00:05.000 --> 00:00:09,000\n<i>late</i> cue\n\n"
+            "3\n00:00:09,500 --> 00:00:12,000\ngone\n")
+    assert parse_srt(text, 8) == [
+        (1.0, 4.5, 'hello\nworld'),
+        (5.0, 8, 'late cue'),
+    ]
+
+def test_repeated_lines_share_one_layer():
+    lines = [(0, 1, 'chorus'), (1, 2, 'verse'), (2, 3, 'chorus'), (2.91, 2.94, 'too short')]
+    overlays = build_overlays(lines, (320, 240), 10, 100)
+    assert [(first, end) for first, end, _ in overlays] == [(0, 10), (10, 20), (20, 30)]
+    assert overlays[0][2] is overlays[2][2]
+    assert overlays[0][2] is not overlays[1][2]
@@ -0,0 +1,60 @@
+from pathlib import Path
+import pytest
+from render_plan import Timeline, STATIC, TRANSITION, dedupe_sources, compile_plan, find_media, unique_outputs
+
+def test_slideshow_length_is_images_times_frames_per_image():
+    for transition_frames in (0, 6, 24):
+        timeline = Timeline.slideshow(7, 24, transition_frames)
+        assert timeline.total_frames == 7 * 24
+        assert sum(segment['frames'] for segment in timeline.segments()) == 7 * 24
+
+def test_transitions_are_clamped_below_an_image():
+    timeline = Timeline.slideshow(3, 10, 50, style='slide_left')
+    assert list(timeline.kinds) == [STATIC, TRANSITION, STATIC, TRANSITION, STATIC]
+    assert list(timeline.frames) == [10, 9, 1, 9, 1]
+    assert timeline.segment(1) == {'kind': 'transition', 'images': (0, 1), 'frames': 9, 'style': 'slide_left'}
+    assert timeline.segment(2) == {'kind': 'static', 'images': (1,), 'frames': 1}
+
+def test_repeated_images_map_to_one_source(tmp_path):
+    a, b = str(tmp_path / 'a.jpg'), str(tmp_path / 'b.jpg')
+    sources, image_sources = dedupe_sources([a, b, a, str(tmp_path / '.' / 'b.jpg'), a])
+    assert sources == [a, b]
+    assert list(image_sources) == [0, 1, 0, 1, 0]
+
+def test_compile_plan():
+    images = ['a.jpg', 'b.jpg', 'a.jpg']
+    plan = compile_plan(images, 'song.mp3', 'out/video.mp4', ['tiktok', 'youtube_short', 'youtube'],
+                        duration_per_image=2, transition_duration=0.5, fps=24, audio_duration=5)
+    assert plan.sources == ['a.jpg', 'b.jpg']
+    assert plan.image_paths == images
+    assert plan.repeated_images == 1
+    assert plan.frames_per_image == 48
+    assert plan.timeline.total_frames == 3 * 48
+    assert plan.video_frames == 5 * 24
+    assert [str(output.path) for output in plan.outputs] == [
+        'out/video_tiktok.mp4', 'out/video_youtube_short.mp4', 'out/video_youtube.mp4']
+    assert [output.frame_size for output in unique_outputs(plan.outputs)] == [(1080, 1920), (1920, 1080)]
+
+def test_compile_plan_spreads_images_over_the_audio():
+    plan = compile_plan(['a.jpg', 'b.jpg'], 'song.mp3', 'video.mp4', duration_per_image=0, audio_duration=20)
+    assert plan.duration_per_image == 10
+    assert plan.timeline.total_frames == 2 * 10 * plan.fps
+
+def test_compile_plan_draft():
+    plan = compile_plan(['a.jpg'], 'song.mp3', 'video.mp4', ['youtube'], draft=True, audio_duration=5)
+    output = plan.outputs[0]
+    assert plan.fps < 24
+    assert output.size == (1920, 1080)
+    assert output.frame_size[0] < 1920
+
+def test_find_media_matches_extensions_in_any_case(tmp_path):
+    for name in ('C.JPG', 'A.png', 'B.jpg', 'notes.txt', 'song.MP3', 'voice.wav'):
+        (tmp_path / name).write_bytes(b'')
+    images, audio = find_media(tmp_path, create=False)
+    assert [Path(path).name for path in images] == ['A.png', 'B.jpg', 'C.JPG']
+    assert Path(audio).name == 'song.MP3'
+
+def test_find_media_missing_folder(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        find_media(tmp_path / 'data', create=False)
+    assert not (tmp_path / 'data').exists()
@@ -0,0 +1,73 @@
+import json
+import wave
+import asyncio
+import urllib.request
+from PIL import Image
+from render_service import start_service, is_loopback, FINISHED
+
+def make_job(tmp_path, name):
+    """A tiny still-image job: 64x64 image over one second of silence"""
+    if not (tmp_path / 'cover.png').exists():
+        Image.new('RGB', (64, 64), (200, 40, 40)).save(tmp_path / 'cover.png')
+        with wave.open(str(tmp_path / 'silence.wav'), 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(8000)
+            f.writeframes(b'\0\0' * 8000)
+    return {'image': 'cover.png', 'audio': 'silence.wav', 'output': f'out/{name}.mp4',
+            'preset': 'custom', 'width': 64, 'height': 64}
+
+def call(port, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(f'http://127.0.0.1:{port}{path}', data=data, method=method)
+    with urllib.request.urlopen(request, timeout=120) as response:
+        return response.status, json.loads(response.read())
+
+def stream_events(port, job_id):
+    """Read the job's Server-Sent Events until it finishes and return their statuses"""
+    statuses = []
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/jobs/{job_id}/events', timeout=120) as response:
+        for line in response:
+            line = line.decode().strip()
+            if line.startswith('event: '):
+                statuses.append(line[len('event: '):])
+    return statuses
+
+def test_render_service_on_localhost(tmp_path):
+    async def scenario():
+        service, server, tasks = await start_service('127.0.0.1', 0, workers=1, base_dir=tmp_path)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            status, first = await asyncio.to_thread(call, port, 'POST', '/jobs', make_job(tmp_path, 'first'))
+            assert status == 202
+            _, second = await asyncio.to_thread(call, port, 'POST', '/jobs', make_job(tmp_path, 'second'))
+
+            # The single worker is still warming up, so the second job is queued
+            status, cancelled = await asyncio.to_thread(call, port, 'DELETE', f"/jobs/{second['id']}")
+            assert (status, cancelled['status']) == (200, 'cancelled')
+
+            statuses = await asyncio.to_thread(stream_events, port, first['id'])
+            assert statuses[0] == 'queued' and 'running' in statuses and statuses[-1] == 'done'
+            assert (tmp_path / 'out' / 'first.mp4').stat().st_size > 0
+            assert not (tmp_path / 'out' / 'second.mp4').exists()
+
+            # A warm worker that died while idle is replaced and the job still runs
+            service.processes[0].kill()
+            service.processes[0].join()
+            _, third = await asyncio.to_thread(call, port, 'POST', '/jobs', make_job(tmp_path, 'third'))
+            statuses = await asyncio.to_thread(stream_events, port, third['id'])
+            assert statuses[-1] == 'done'
+            _, health = await asyncio.to_thread(call, port, 'GET', '/health')
+            assert health['ready'] == 1 and health['running'] == 0
+            assert all(record['status'] in FINISHED for record in service.jobs.values())
+        finally:
+            for task in tasks:
+                task.cancel()
+            server.close()
+            service.stop()
+
+    asyncio.run(scenario())
+
+def test_only_loopback_hosts_count_as_local():
+    assert all(is_loopback(host) for host in ('127.0.0.1', '127.0.0.2', '::1', 'localhost'))
+    assert not any(is_loopback(host) for host in ('0.0.0.0', '::', '192.168.1.10', 'example.com'))
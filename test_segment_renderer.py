@@ -0,0 +1,21 @@
+from render_plan import Timeline
+from segment_renderer import split_into_chunks
+
+def test_chunks_start_on_image_boundaries():
+    """Each image, with the transition that leads into it, lands in exactly one chunk"""
+    segments = list(enumerate(Timeline.slideshow(10, 24, 6).segments()))
+    groups = split_into_chunks(segments, 10, 3)
+
+    assert len(groups) == 3
+    assert [segment for group in groups for segment in group] == segments
+    owners = [{segment['images'][-1] for _, segment in group} for group in groups]
+    assert owners == [{0, 1, 2}, {3, 4, 5, 6}, {7, 8, 9}]
+    for group in groups[1:]:
+        _, first = group[0]
+        assert first['kind'] == 'transition'
+        assert first['images'][1] == min(segment['images'][-1] for _, segment in group)
+
+def test_more_chunks_than_images():
+    segments = list(enumerate(Timeline.slideshow(2, 24, 6).segments()))
+    assert len(split_into_chunks(segments, 2, 8)) == 2
+    assert split_into_chunks(segments, 2, 1) == [segments]
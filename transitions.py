@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Transitions
+Fast NumPy transition engine used for the transition windows of a slideshow
+
+Every generator yields the same preallocated output buffer for each frame, so
+the consumer must use (or copy) a frame before asking for the next one.
+moving_transition_frames does the same for images that change every frame
+(Ken Burns motion).
+"""
+
+# Crossfade weights are 7-bit fixed point so (b - a) * weight fits in int16
+BLEND_BITS = 7
+BLEND_ONE = 1 << BLEND_BITS
+
+def progress_steps(n_frames):
+    """Transition progress for each frame, strictly between 0 and 1"""
+    return [(k + 1) / (n_frames + 1) for k in range(n_frames)]
+
+def crossfade(frame_a, frame_b, n_frames):
+    """Blend frame_a into frame_b with integer fixed-point arithmetic"""
+    import numpy as np
+    base = frame_a.astype(np.int16)
+    diff = frame_b.astype(np.int16)
+    diff -= base
+    work = np.empty_like(diff)
+    out = np.empty_like(frame_a)
+    for progress in progress_steps(n_frames):
+        np.multiply(diff, round(progress * BLEND_ONE), out=work)
+        np.right_shift(work, BLEND_BITS, out=work)
+        np.add(work, base, out=work)
+        np.copyto(out, work, casting='unsafe')
+        yield out
+
+def wipe(frame_a, frame_b, n_frames):
+    """Reveal frame_b from left to right"""
+    width = frame_a.shape[1]
+    out = frame_a.copy()
+    done = 0
+    for progress in progress_steps(n_frames):
+        edge = round(progress * width)
+        out[:, done:edge] = frame_b[:, done:edge]
+        done = edge
+        yield out
+
+def slide(frame_a, frame_b, n_frames):
+    """Push frame_a out to the left while frame_b slides in from the right"""
+    width = frame_a.shape[1]
+    out = frame_a.copy()
+    for progress in progress_steps(n_frames):
+        offset = round(progress * width)
+        out[:, :width - offset] = frame_a[:, offset:]
+        out[:, width - offset:] = frame_b[:, :offset]
+        yield out
+
+TRANSITIONS = {
+    'crossfade': crossfade,
+    'wipe': wipe,
+    'slide': slide,
+}
+
+def transition_frames(style, frame_a, frame_b, n_frames):
+    """Yield the frames of a transition from frame_a to frame_b"""
+    if style not in TRANSITIONS:
+        raise ValueError(f"Unknown transition '{style}'. Choose from: {', '.join(TRANSITIONS)}")
+    return TRANSITIONS[style](frame_a, frame_b, n_frames)
+
+def moving_transition_frames(style, frames_a, frames_b, n_frames):
+    """Yield a transition between two iterables of frames, taking one frame of each per step"""
+    import numpy as np
+    if style not in TRANSITIONS:
+        raise ValueError(f"Unknown transition '{style}'. Choose from: {', '.join(TRANSITIONS)}")
+    out = work = None
+    for progress, frame_a, frame_b in zip(progress_steps(n_frames), frames_a, frames_b):
+        if out is None:
+            out = np.empty_like(frame_a)
+            work = np.empty(frame_a.shape, np.int16)
+        width = frame_a.shape[1]
+        edge = round(progress * width)
+        if style == 'crossfade':
+            np.subtract(frame_b, frame_a, out=work, dtype=np.int16)
+            np.multiply(work, round(progress * BLEND_ONE), out=work)
+            np.right_shift(work, BLEND_BITS, out=work)
+            np.add(work, frame_a, out=work)
+            np.copyto(out, work, casting='unsafe')
+        elif style == 'wipe':
+            out[:, :edge] = frame_b[:, :edge]
+            out[:, edge:] = frame_a[:, edge:]
+        else:
+            out[:, :width - edge] = frame_a[:, edge:]
+            out[:, width - edge:] = frame_b[:, :edge]
+        yield out
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Audio Visualizer
+Animated spectrum bars or waveform drawn over a still image
+
+The audio is decoded once by an ffmpeg pipe into mono float samples and
+processed a chunk of frames at a time. Each chunk runs one windowed FFT over
+all of its frames, so memory stays flat no matter how long the track is.
+Only a strip at the bottom of the frame is redrawn per frame. The rest of
+the reused frame buffer keeps the still image.
+"""
+
+import subprocess
+import numpy as np
+from ffmpeg_utils import get_ffmpeg_binary, encode_frames
+import profiler
+
+STYLES = ('bars', 'wave')
+
+# Analysis settings: one hop of samples per video frame
+HOP_SAMPLES = 1000
+FFT_SIZE = 2048
+CHUNK_FRAMES = 512
+FLOOR_DB = -70.0
+
+def decode_chunks(audio_path, sample_rate, chunk_samples):
+    """Yield mono float32 sample blocks of at most chunk_samples from any audio file"""
+    cmd = [get_ffmpeg_binary(), '-hide_banner', '-loglevel', 'error', '-i', str(audio_path),
+           '-vn', '-ac', '1', '-ar', str(sample_rate), '-f', 'f32le', 'pipe:1']
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            data = process.stdout.read(chunk_samples * 4)
+            if not data:
+                break
+            yield np.frombuffer(data[:len(data) // 4 * 4], dtype=np.float32)
+    finally:
+        process.stdout.close()
+        process.kill()
+        process.wait()
+
+def frame_windows(audio_path, fps, n_frames, hop=HOP_SAMPLES, size=FFT_SIZE, chunk_frames=CHUNK_FRAMES):
+    """Yield (chunk_frames, size) arrays holding the analysis window of every video frame.
+
+    Windows are centred on their frame. The last chunk is padded with silence so
+    exactly n_frames windows come out.
+    """
+    lead = (size - hop) // 2
+    pending = np.zeros(lead, np.float32)
+    done = 0
+    for block in decode_chunks(audio_path, fps * hop, chunk_frames * hop):
+        pending = np.concatenate([pending, block])
+        ready = min(n_frames - done, (len(pending) - size) // hop + 1)
+        if ready > 0:
+            windows = np.lib.stride_tricks.sliding_window_view(pending, size)[::hop][:ready]
+            yield windows
+            done += ready
+            pending = pending[ready * hop:]
+        if done >= n_frames:
+            return
+    if done < n_frames:
+        pending = np.concatenate([pending, np.zeros((n_frames - done) * hop + size, np.float32)])
+        yield np.lib.stride_tricks.sliding_window_view(pending, size)[::hop][:n_frames - done]
+
+def band_edges(n_bars, sample_rate, size=FFT_SIZE, low_hz=40, high_hz=12000):
+    """Log-spaced FFT bin edges for the spectrum bars (fewer bars if low bands would be empty)"""
+    high_hz = min(high_hz, sample_rate * 0.45)
+    edges = np.geomspace(low_hz, high_hz, n_bars + 1) * size / sample_rate
+    return np.unique(np.round(edges).astype(int))
+
+def spectrum_levels(windows, edges):
+    """Bar heights in 0..1 for every window: log-spaced band energy in dB above FLOOR_DB"""
+    window = np.hanning(windows.shape[1]).astype(np.float32)
+    spectrum = np.abs(np.fft.rfft(windows * window, axis=1))
+    spectrum /= window.sum() / 2  # a full-scale sine peaks at 1.0
+    bands = np.add.reduceat(spectrum[:, edges[0]:edges[-1]], edges[:-1] - edges[0], axis=1)
+    bands /= np.diff(edges)
+    levels = 20 * np.log10(bands + 1e-9)
+    return np.clip(1 - levels / FLOOR_DB, 0, 1)
+
+def waveform_levels(windows, columns):
+    """Signed waveform amplitude in -1..1 sampled at every column of the strip"""
+    picks = np.linspace(0, windows.shape[1] - 1, columns).astype(int)
+    return np.clip(windows[:, picks], -1, 1)
+
+def visualizer_frames(background, audio_path, fps, n_frames, style='bars', n_bars=48,
+                      color=(255, 255, 255), opacity=0.85, strip_height=0.2):
+    """Yield every frame of the video, reusing one buffer in which only the bottom strip changes"""
+    if style not in STYLES:
+        raise ValueError(f"Unknown visualizer '{style}'. Choose from: {', '.join(STYLES)}")
+    height, width = background.shape[:2]
+    strip = max(8, int(height * strip_height))
+    margin = width // 20
+    top = height - strip - height // 24
+    columns = width - 2 * margin
+
+    frame = np.array(background)
+    region = frame[top:top + strip, margin:margin + columns]
+    plain = region.copy()
+    painted = (plain * (1 - opacity) + np.array(color) * opacity).astype(np.uint8)
+    rows = np.arange(strip, dtype=np.float32)[:, None]
+    mask = np.empty((strip, columns), bool)
+
+    if style == 'bars':
+        edges = band_edges(n_bars, fps * HOP_SAMPLES)
+        n_bars = len(edges) - 1
+        slot = columns / n_bars
+        bar_of_column = (np.arange(columns) / slot).astype(int)
+        in_gap = (np.arange(columns) % slot) > slot * 0.75
+        depth = (strip - 1) - rows  # distance from the strip's bottom edge
+        heights = np.zeros(n_bars, np.float32)
+    else:
+        depth = np.abs(rows - (strip - 1) / 2)
+
+    for windows in frame_windows(audio_path, fps, n_frames):
+        with profiler.span('visualizer chunk', 'visualizer', frames=len(windows)):
+            levels = (spectrum_levels(windows, edges) if style == 'bars' else
+                      waveform_levels(windows, columns))
+        for level in levels:
+            if style == 'bars':
+                # Bars jump up at once and fall back smoothly
+                np.maximum(level, heights * 0.85, out=heights)
+                column_heights = heights[bar_of_column] * strip
+                column_heights[in_gap] = 0
+                np.less(depth, column_heights, out=mask)
+            else:
+                np.less_equal(depth, np.abs(level) * (strip / 2) + 0.5, out=mask)
+            np.copyto(region, plain)
+            np.copyto(region, painted, where=mask[..., None])
+            yield frame
+
+def render_visualizer_video(background, audio_path, output_path, duration, fps=24, style='bars',
+                            threads=None, overlays=None, preset='fast'):
+    """Encode a still image with an animated visualizer strip and mux the (AAC) audio with stream copy"""
+    height, width = background.shape[:2]
+    n_frames = max(1, round(duration * fps))
+    frames = visualizer_frames(background, audio_path, fps, n_frames, style)
+    if overlays:
+        from lyrics import overlay_frames
+        frames = overlay_frames(frames, [(first, end, i) for i, (first, end, _) in enumerate(overlays)],
+                                [layer for _, _, layer in overlays])
+    encode_frames(frames, width, height, fps, output_path, preset, threads, audio_path=audio_path,
+                  duration=n_frames / fps)
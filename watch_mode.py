@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Watch Mode
+Re-run a render whenever the files in a folder change
+
+The folder is polled, so this works the same on every platform and
+needs no extra dependencies. Each re-render is incremental as long as the
+frame, audio and segment caches are enabled: unchanged images come from the
+frame cache and their encoded segments from the segment cache.
+"""
+
+import os
+import time
+from pathlib import Path
+
+def snapshot(folder):
+    """Map every file in folder to (size, mtime_ns)"""
+    try:
+        entries = os.scandir(folder)
+    except FileNotFoundError:
+        return {}
+    with entries:
+        return {
+            entry.name: (entry.stat().st_size, entry.stat().st_mtime_ns)
+            for entry in entries if entry.is_file()
+        }
+
+def describe_changes(before, after):
+    """One-line summary of what changed between two snapshots"""
+    added = sorted(set(after) - set(before))
+    removed = sorted(set(before) - set(after))
+    changed = sorted(name for name in set(before) & set(after) if before[name] != after[name])
+    parts = [f"{label}: {', '.join(names)}" for label, names in
+             (('added', added), ('removed', removed), ('changed', changed)) if names]
+    return '; '.join(parts) or 'no changes'
+
+def is_up_to_date(state, outputs):
+    """True when every output exists and is newer than every watched file"""
+    newest_input = max((mtime for _, mtime in state.values()), default=0)
+    try:
+        return all(Path(output).stat().st_mtime_ns >= newest_input for output in outputs)
+    except FileNotFoundError:
+        return False
+
+def watch(folder, render, interval=1.0, outputs=()):
+    """Call render() now and after every change to folder, until Ctrl+C.
+
+    A change is only acted on once the folder has stayed the same for one
+    interval, so files that are still being copied are not rendered half
+    written. The first render is skipped when outputs are already newer than
+    every input.
+    """
+    print(f"👀 Watching '{folder}' for changes (Ctrl+C to stop)...")
+    last = snapshot(folder)
+    if outputs and is_up_to_date(last, outputs):
+        print("⏭️  Output is up to date, waiting for changes")
+    else:
+        last = None
+
+    try:
+        while True:
+            current = snapshot(folder)
+            if current == last:
+                time.sleep(interval)
+                continue
+
+            time.sleep(interval)
+            if snapshot(folder) != current:
+                continue  # Still changing, wait for it to settle
+
+            if last is not None:
+                print(f"\n🔄 {describe_changes(last, current)}")
+            start = time.perf_counter()
+            try:
+                render()
+                print(f"⏱️  Rendered in {time.perf_counter() - start:.1f}s, watching for changes...")
+            except Exception as e:
+                print(f"❌ Error: {str(e)}")
+            last = current
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    return 0